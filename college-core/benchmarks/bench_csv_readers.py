@@ -0,0 +1,73 @@
+"""Compare the pandas and Arrow CSV reader backends on a synthetic student upload.
+
+Each backend reads the whole file in IMPORT_CHUNK_SIZE chunks in a fresh
+process, reporting parse time, peak RSS growth and the in-memory size of
+one chunk.
+
+Usage: python -m benchmarks.bench_csv_readers --rows 1000000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from college.core.config import config
+from benchmarks.common import write_student_csv
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def read_file(backend: str, file_path: str, chunk_size: int) -> dict:
+    config.IMPORT_READER_BACKEND = backend
+    from college.utils.readers import read_chunks
+
+    dtype = {"phone_no": str, "adm_year": str, "adm_no": str, "reg_no": str}
+    # Read the header alone first so lazily imported reader modules are not
+    # counted as parsing memory
+    warm_up = f"{file_path}.header"
+    with open(file_path, "rb") as src, open(warm_up, "wb") as dst:
+        dst.write(src.readline())
+    for _ in read_chunks(warm_up, chunk_size, dtype):
+        pass
+    os.remove(warm_up)
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    rows, chunk_mb = 0, 0.0
+    for chunk in read_chunks(file_path, chunk_size, dtype):
+        if not rows:
+            chunk_mb = chunk.memory_usage(deep=True).sum() / (1 << 20)
+        rows += len(chunk)
+    return {
+        "backend": backend,
+        "rows": rows,
+        "seconds": round(time.perf_counter() - start, 2),
+        "peak_rss_mb": round(_peak_rss_mb() - baseline, 1),
+        "chunk_mb": round(chunk_mb, 2),
+    }
+
+
+def main(args):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "students.csv")
+        write_student_csv(file_path, args.rows, [f"Program {i}" for i in range(10)],
+                          [f"Batch {i}" for i in range(40)])
+        print(f"{args.rows} rows, {os.path.getsize(file_path) / (1 << 20):.0f} MiB")
+        context = multiprocessing.get_context("spawn")
+        for backend in ("pandas", "arrow"):
+            with context.Pool(1) as pool:
+                results.append(pool.apply(read_file, (backend, file_path, args.chunk_size)))
+    print(f'{"backend":<8}  {"rows":>9}  {"seconds":>8}  {"peak RSS MB":>12}  {"chunk MB":>9}')
+    for r in results:
+        print(f'{r["backend"]:<8}  {r["rows"]:>9}  {r["seconds"]:>8}  {r["peak_rss_mb"]:>12}  {r["chunk_mb"]:>9}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--chunk-size", type=int, default=config.IMPORT_CHUNK_SIZE)
+    main(parser.parse_args())
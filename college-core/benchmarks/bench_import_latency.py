@@ -0,0 +1,175 @@
+"""Measure API latency while a student upload is being imported.
+
+The app is started under uvicorn against a throwaway database, the upload is
+posted to /student/upload/ and, until its import job finishes, a probe keeps
+requesting a page of /student/ and records how long each response takes. The
+import runs once with IMPORT_EXECUTOR=inline and once with the process pool.
+
+Usage: python -m benchmarks.bench_import_latency --rows 100000
+Requires MONGO_DATABASE_URL; seeds and drops its own database.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import Optional
+from benchmarks.common import BenchDatabase, write_student_csv
+
+HOST = "127.0.0.1"
+PROBE_PATH = "/student/?limit=20"
+
+
+async def seed(db: BenchDatabase, programs: int, batches: int):
+    now = datetime.now()
+    program_names = [f"Program {i}" for i in range(programs)]
+    program_ids = (await db.get_collection_reference("programs").insert_many([
+        {"program_name": name, "status": "Active", "created_at": now, "updated_at": now}
+        for name in program_names
+    ])).inserted_ids
+    batch_names = [f"Batch {i}" for i in range(batches)]
+    await db.get_collection_reference("batches").insert_many([
+        {"batch_name": name, "program_id": str(program_ids[i % programs]),
+         "status": "Active", "created_at": now, "updated_at": now}
+        for i, name in enumerate(batch_names)
+    ])
+    return program_names, batch_names
+
+
+async def http_request(port: int, method: str, path: str, body: bytes = b"",
+                       headers: Optional[dict] = None) -> tuple:
+    """One HTTP/1.1 request on a fresh connection; returns (status, body)."""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    lines = [f"{method} {path} HTTP/1.1", f"Host: {HOST}:{port}", "Connection: close",
+             f"Content-Length: {len(body)}", *(f"{k}: {v}" for k, v in (headers or {}).items())]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    status_line, _, rest = response.partition(b"\r\n")
+    return int(status_line.split()[1]), rest.partition(b"\r\n\r\n")[2]
+
+
+async def upload(port: int, file_path: str) -> str:
+    boundary = uuid.uuid4().hex
+    with open(file_path, "rb") as f:
+        content = f.read()
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="students.csv"\r\n'
+            f'Content-Type: text/csv\r\n\r\n').encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    status, payload = await http_request(port, "POST", "/student/upload/", body,
+                                         {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    assert status == 200, f"upload failed: {status} {payload[:200]}"
+    return json.loads(payload)["job_id"]
+
+
+async def wait_for_job(port: int, job_id: str) -> dict:
+    while True:
+        status, payload = await http_request(port, "GET", f"/imports/{job_id}/")
+        job = json.loads(payload)
+        if job["status"] in ("completed", "failed"):
+            return job
+        await asyncio.sleep(0.5)
+
+
+async def probe(port: int, latencies: list, done: asyncio.Event, interval: float):
+    while not done.is_set():
+        start = time.perf_counter()
+        status, _ = await http_request(port, "GET", PROBE_PATH)
+        assert status == 200, f"probe failed: {status}"
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def start_server(port: int, env: dict) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "college.main:app", "--host", HOST, "--port", str(port),
+         "--log-level", "warning"], env=env)
+    for _ in range(300):
+        try:
+            await http_request(port, "GET", "/")
+            return server
+        except OSError:
+            await asyncio.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("server did not start")
+
+
+async def run_import(db: BenchDatabase, file_path: str, executor: str, args, uploads_dir: str) -> dict:
+    for name in ("students", "users", "import_jobs"):
+        await db.get_collection_reference(name).delete_many({})
+    env = {
+        **os.environ,
+        "MONGO_DATABASE_NAME": db.database_name,
+        "UPLOADS_DIR": uploads_dir,
+        "IMPORT_EXECUTOR": executor,
+        # The benchmark file is the "large file" the pool is meant for
+        "IMPORT_PROCESS_MIN_ROWS": "0",
+        "IMPORT_JOB_CONCURRENCY": "1",
+        "IMPORT_JOB_POLL_SECONDS": "0.2",
+    }
+    server = await start_server(args.port, env)
+    latencies, done = [], asyncio.Event()
+    try:
+        start = time.perf_counter()
+        job_id = await upload(args.port, file_path)
+        probe_task = asyncio.create_task(probe(args.port, latencies, done, args.interval / 1000))
+        try:
+            job = await wait_for_job(args.port, job_id)
+        finally:
+            done.set()
+            await probe_task
+        seconds = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+    # A failed import finishes early and would make its latency look good
+    assert job["status"] == "completed", f"{executor} import did not complete: {job.get('error')}"
+    latencies.sort()
+    return {
+        "executor": executor,
+        "status": job["status"],
+        "seconds": round(seconds, 2),
+        "requests": len(latencies),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(latencies[max(int(len(latencies) * 0.99) - 1, 0)], 2),
+        "max_ms": round(latencies[-1], 2),
+    }
+
+
+async def main(args):
+    db = BenchDatabase()
+    await db.connect()
+    await db.drop()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "students.csv")
+        try:
+            program_names, batch_names = await seed(db, args.programs, args.batches)
+            write_student_csv(file_path, args.rows, program_names, batch_names)
+            for executor in ("inline", "process"):
+                results.append(await run_import(db, file_path, executor, args, tmp))
+        finally:
+            await db.drop()
+            await db.close()
+    print(f'{"executor":<10}  {"status":<10}  {"seconds":>8}  {"requests":>8}  '
+          f'{"p50 ms":>8}  {"p99 ms":>8}  {"max ms":>8}')
+    for r in results:
+        print(f'{r["executor"]:<10}  {r["status"]:<10}  {r["seconds"]:>8}  {r["requests"]:>8}  '
+              f'{r["p50_ms"]:>8}  {r["p99_ms"]:>8}  {r["max_ms"]:>8}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--programs", type=int, default=10)
+    parser.add_argument("--batches", type=int, default=40)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=10, help="probe interval in ms")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""Compare the aggregated student listing against the per-student enrichment loop.
+
+Usage: python -m benchmarks.bench_student_listing --students 20000
+Requires MONGO_DATABASE_URL; seeds and drops its own database.
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from bson import ObjectId
+from college.services.student_services import StudentMgr
+from benchmarks.common import BenchDatabase, measure, print_results
+
+
+async def seed(db: BenchDatabase, students: int, programs: int, batches: int):
+    now = datetime.now()
+    program_ids = (await db.get_collection_reference("programs").insert_many([
+        {"program_name": f"Program {i}", "status": "Active", "created_at": now, "updated_at": now}
+        for i in range(programs)
+    ])).inserted_ids
+    batch_ids = (await db.get_collection_reference("batches").insert_many([
+        {"batch_name": f"Batch {i}", "program_id": str(program_ids[i % programs]),
+         "status": "Active", "created_at": now, "updated_at": now}
+        for i in range(batches)
+    ])).inserted_ids
+    await db.get_collection_reference("students").insert_many([
+        {"first_name": f"Student{i}", "email": f"student{i}@example.com",
+         "phone_no": "9999999999", "adm_no": str(i), "adm_year": "2024",
+         "program_id": str(program_ids[i % programs]),
+         "batch_id": str(batch_ids[i % batches]),
+         "status": "Active", "created_at": now, "updated_at": now}
+        for i in range(students)
+    ])
+
+
+async def find_by_id(collection, document_id: str):
+    doc = await collection.find_one({"_id": ObjectId(document_id)})
+    if doc:
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+
+async def legacy_get_all_students(db: BenchDatabase):
+    # Queries the collections directly: the managers' lookups are now served by
+    # PROGRAM_CACHE/BATCH_CACHE and would hide the 2N round trips being compared
+    programs = db.get_collection_reference("programs")
+    batches = db.get_collection_reference("batches")
+    students = await db.get_collection_reference("students").find().to_list(length=None)
+    for student in students:
+        student["_id"] = str(student["_id"])
+        if student.get("program_id"):
+            student["program"] = await find_by_id(programs, student["program_id"])
+        if student.get("batch_id"):
+            student["batch"] = await find_by_id(batches, student["batch_id"])
+    return students
+
+
+async def main(args):
+    db = BenchDatabase()
+    await db.connect()
+    await db.drop()
+    results = []
+    try:
+        await seed(db, args.students, args.programs, args.batches)
+        student_mgr = StudentMgr(db)
+        with measure(db, "per-student loop", results):
+            legacy = await legacy_get_all_students(db)
+        with measure(db, "$lookup pipeline", results):
+            aggregated = await student_mgr.get_all_students()
+        assert len(legacy) == len(aggregated)
+    finally:
+        await db.drop()
+        await db.close()
+    print_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--programs", type=int, default=10)
+    parser.add_argument("--batches", type=int, default=40)
+    asyncio.run(main(parser.parse_args()))
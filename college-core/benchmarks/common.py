@@ -0,0 +1,79 @@
+import csv
+import time
+from contextlib import contextmanager
+from pymongo import AsyncMongoClient
+from pymongo.monitoring import CommandListener
+from college.core.config import config
+from college.db.database import DatabaseConnection
+
+
+class CommandCounter(CommandListener):
+    """Counts commands sent to the server, i.e. network round trips."""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class BenchDatabase:
+    """Stand-in for DatabaseConnection bound to a throwaway benchmark database."""
+
+    def __init__(self, database_name: str = "collegedb_bench"):
+        self.counter = CommandCounter()
+        self.client = AsyncMongoClient(config.MONGO_URL, event_listeners=[self.counter])
+        self.database_name = database_name
+        self.db = self.client.get_database(database_name)
+        self._supports_transactions = None
+
+    supports_transactions = DatabaseConnection.supports_transactions
+
+    def get_collection_reference(self, collection_name: str):
+        return self.db.get_collection(collection_name)
+
+    async def connect(self):
+        await self.db.command("ping")
+
+    async def drop(self):
+        await self.client.drop_database(self.database_name)
+
+    async def close(self):
+        await self.client.close()
+
+
+@contextmanager
+def measure(db: BenchDatabase, label: str, results: list):
+    start_count = db.counter.count
+    start = time.perf_counter()
+    yield
+    results.append({
+        "label": label,
+        "round_trips": db.counter.count - start_count,
+        "seconds": round(time.perf_counter() - start, 3),
+    })
+
+
+def print_results(results: list):
+    width = max(len(r["label"]) for r in results)
+    print(f'{"":<{width}}  {"round trips":>12}  {"seconds":>9}')
+    for r in results:
+        print(f'{r["label"]:<{width}}  {r["round_trips"]:>12}  {r["seconds"]:>9}')
+
+
+def write_student_csv(file_path: str, rows: int, program_names: list, batch_names: list):
+    """Write a synthetic student upload with ``rows`` valid rows."""
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["first_name", "last_name", "email", "phone_no", "gender", "dob",
+                         "adm_no", "adm_year", "program_name", "batch_name"])
+        for i in range(rows):
+            writer.writerow([f"Student{i}", "Bench", f"student{i}@example.com", "9999999999",
+                             "Female" if i % 2 else "Male", "2004-01-15", str(i), "2024",
+                             program_names[i % len(program_names)], batch_names[i % len(batch_names)]])
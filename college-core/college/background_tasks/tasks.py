@@ -5,9 +5,11 @@ from college.services.course_services import CourseMgr
 from college.services.faculty_services import FacultyMgr
 from college.services.program_services import ProgramMgr
 from college.services.student_services import StudentMgr
+from college.utils.dataloader import detach_request_scope
 
 
 async def process_batch_csv(file_path: str, file_id: str):
+    detach_request_scope()
     db = get_db()
     await db.connect()
     batch_mgr = BatchMgr(db)
@@ -17,6 +19,7 @@ async def process_batch_csv(file_path: str, file_id: str):
     
 
 async def process_program_csv(file_path: str, file_id: str):
+    detach_request_scope()
     db = get_db()
     await db.connect()
     program_mgr = ProgramMgr(db)
@@ -25,6 +28,7 @@ async def process_program_csv(file_path: str, file_id: str):
     app_logger.info(f'Background Process: Processing Program csv file completed')
 
 async def process_faculty_csv(file_path: str, file_id: str):
+    detach_request_scope()
     db = get_db()
     await db.connect()
     faculty_mgr = FacultyMgr(db)
@@ -33,6 +37,7 @@ async def process_faculty_csv(file_path: str, file_id: str):
     app_logger.info(f'Background Process: Processing Faculty csv file completed')
 
 async def process_course_csv(file_path: str, file_id: str):
+    detach_request_scope()
     db = get_db()
     await db.connect()
     course_mgr = CourseMgr(db)
@@ -41,6 +46,7 @@ async def process_course_csv(file_path: str, file_id: str):
     app_logger.info(f'Background Process: Processing Course csv file completed')
     
 async def process_student_csv(file_path: str, file_id: str):
+    detach_request_scope()
     db = get_db()
     await db.connect()
     student_mgr = StudentMgr(db)
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import socket
+import uuid
+from college.background_tasks.tasks import (process_batch_csv, process_course_csv, process_faculty_csv,
+                                            process_program_csv, process_student_csv)
+from college.core.config import config
+from college.core.logging_config import app_logger
+from college.db.database import DatabaseConnection
+from college.services.import_job_services import ImportJobMgr, new_progress
+from college.utils.utilities import PROGRESS_TRACKER
+
+IMPORT_HANDLERS = {
+    "program": process_program_csv,
+    "batch": process_batch_csv,
+    "course": process_course_csv,
+    "faculty": process_faculty_csv,
+    "student": process_student_csv,
+}
+
+
+class ImportWorkerPool:
+    """Runs queued import jobs with up to ``concurrency`` imports at a time.
+
+    Every uvicorn worker or replica can run a pool; they coordinate only
+    through the job leases in ``import_jobs``. Uploaded files must therefore
+    sit on storage that all of them can read (UPLOADS_DIR).
+
+    While a job runs, its live progress lives in PROGRESS_TRACKER of this
+    process and is copied onto the job document with every lease renewal.
+    """
+
+    def __init__(self, db: DatabaseConnection, concurrency: int = 0):
+        self.db = db
+        self.concurrency = concurrency or config.IMPORT_JOB_CONCURRENCY
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks = []
+
+    def start(self):
+        job_mgr = ImportJobMgr(self.db)
+        self._tasks = [
+            asyncio.create_task(self._worker(job_mgr, f"{self.worker_id}/{slot}"))
+            for slot in range(self.concurrency)
+        ]
+        app_logger.info(f'Import worker pool {self.worker_id} started with {self.concurrency} workers')
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        app_logger.info(f'Import worker pool {self.worker_id} stopped')
+
+    async def _worker(self, job_mgr: ImportJobMgr, worker_id: str):
+        while True:
+            try:
+                await job_mgr.fail_abandoned()
+                job = await job_mgr.claim(worker_id)
+            except Exception as e:
+                app_logger.error(f'Import worker {worker_id} could not claim a job: {str(e)}')
+                job = None
+            if job is None:
+                await asyncio.sleep(config.IMPORT_JOB_POLL_SECONDS)
+                continue
+            await self._run(job_mgr, worker_id, job)
+
+    async def _run(self, job_mgr: ImportJobMgr, worker_id: str, job: dict):
+        job_id = str(job["_id"])
+        progress = PROGRESS_TRACKER[job_id] = new_progress()
+        app_logger.info(f'Import job {job_id} ({job["kind"]}) claimed by {worker_id}, attempt {job["attempts"]}')
+        task = asyncio.create_task(IMPORT_HANDLERS[job["kind"]](job["file_path"], job_id))
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=config.IMPORT_JOB_HEARTBEAT_SECONDS)
+                if done:
+                    break
+                try:
+                    leased = await job_mgr.heartbeat(job_id, worker_id, progress)
+                except Exception as e:
+                    app_logger.error(f'Import job {job_id} heartbeat failed: {str(e)}')
+                    continue
+                if not leased:
+                    app_logger.warning(f'Import job {job_id} lost its lease, abandoning it')
+                    task.cancel()
+                    return
+            if task.exception() is not None:
+                progress["status"] = f"failed: {str(task.exception())}"
+            await job_mgr.finish(job_id, worker_id, progress)
+        except asyncio.CancelledError:
+            task.cancel()
+            await asyncio.shield(job_mgr.release(job_id, worker_id, progress))
+            raise
+        except Exception as e:
+            app_logger.error(f'Import job {job_id} could not be finished: {str(e)}')
+        finally:
+            PROGRESS_TRACKER.pop(job_id, None)
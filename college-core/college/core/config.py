@@ -14,6 +14,35 @@ class BaseConfig:
         
 
         self.UPLOADS_DIR = os.getenv("UPLOADS_DIR","uploads")
+        self.MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 512 * 1024 * 1024))
+
+        # STREAMING CONFIGURATION
+        self.STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 500))
+
+        # IMPORT CONFIGURATION
+        self.IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))
+        # "inline" validates chunks on the event loop; "process" opts large files
+        # (IMPORT_PROCESS_MIN_ROWS and up) into a process pool, whose spawned
+        # workers re-import the app and cost more than they save on small ones
+        self.IMPORT_EXECUTOR = os.getenv("IMPORT_EXECUTOR", "inline")
+        self.IMPORT_PROCESS_MIN_ROWS = int(os.getenv("IMPORT_PROCESS_MIN_ROWS", 100000))
+        self.IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", 2))
+        # "pandas" (C engine) or "arrow" (multithreaded, pyarrow-backed string columns)
+        self.IMPORT_READER_BACKEND = os.getenv("IMPORT_READER_BACKEND", "pandas")
+
+        # IMPORT JOB QUEUE CONFIGURATION
+        # Imports run concurrently per process; 0 only enqueues jobs for other workers
+        self.IMPORT_JOB_CONCURRENCY = int(os.getenv("IMPORT_JOB_CONCURRENCY", 2))
+        self.IMPORT_JOB_LEASE_SECONDS = int(os.getenv("IMPORT_JOB_LEASE_SECONDS", 60))
+        self.IMPORT_JOB_HEARTBEAT_SECONDS = float(os.getenv("IMPORT_JOB_HEARTBEAT_SECONDS", 2))
+        self.IMPORT_JOB_POLL_SECONDS = float(os.getenv("IMPORT_JOB_POLL_SECONDS", 2))
+        self.IMPORT_JOB_MAX_ATTEMPTS = int(os.getenv("IMPORT_JOB_MAX_ATTEMPTS", 3))
+        # Progress events per watched job are coalesced to one sample per interval
+        self.IMPORT_EVENTS_INTERVAL_SECONDS = float(os.getenv("IMPORT_EVENTS_INTERVAL_SECONDS", 1))
+
+        # CACHE CONFIGURATION
+        self.CACHE_MAX_SIZE = int(os.getenv("CACHE_MAX_SIZE", 1024))
+        self.CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", 300))
         
         # LOG FILE CONFIGURATION
         self.LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
@@ -0,0 +1,62 @@
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY_ERROR = 11000
+IMPORT_KEY_FIELD = "import_key"
+
+
+def _write_failures(bwe: BulkWriteError, duplicate_message: str) -> dict:
+    failures = {}
+    for error in bwe.details.get("writeErrors", []):
+        if error.get("code") == DUPLICATE_KEY_ERROR:
+            failures[error["index"]] = duplicate_message
+        else:
+            failures[error["index"]] = error.get("errmsg", "Write failed")
+    return failures
+
+
+async def insert_many_unordered(collection, documents: list, duplicate_message: str = "Duplicate key", **kwargs) -> dict:
+    """Insert documents with ordered=False and return {position: error} for rejected ones.
+
+    Every document that does not appear in the result was written.
+    """
+    if not documents:
+        return {}
+    try:
+        await collection.insert_many(documents, ordered=False, **kwargs)
+        return {}
+    except BulkWriteError as bwe:
+        return _write_failures(bwe, duplicate_message)
+
+
+async def upsert_many_unordered(collection, documents: list, keys: list,
+                                duplicate_message: str = "Duplicate key", **kwargs) -> dict:
+    """Idempotently insert documents identified by their import key.
+
+    A document whose key is already present is left untouched and counts as
+    written, so replaying the same rows is a no-op. Returns {position: error}
+    like insert_many_unordered.
+    """
+    failures, _ = await upsert_many_inserted(collection, documents, keys, duplicate_message, **kwargs)
+    return failures
+
+
+async def upsert_many_inserted(collection, documents: list, keys: list,
+                               duplicate_message: str = "Duplicate key", **kwargs) -> tuple:
+    """upsert_many_unordered that also returns the positions it newly inserted.
+
+    Written positions missing from that set already existed under their key,
+    so any ``_id`` set on their document was not used.
+    """
+    if not documents:
+        return {}, set()
+    requests = [
+        UpdateOne({IMPORT_KEY_FIELD: key}, {"$setOnInsert": {**doc, IMPORT_KEY_FIELD: key}}, upsert=True)
+        for doc, key in zip(documents, keys)
+    ]
+    try:
+        result = await collection.bulk_write(requests, ordered=False, **kwargs)
+        return {}, set(result.upserted_ids)
+    except BulkWriteError as bwe:
+        inserted = {upsert["index"] for upsert in bwe.details.get("upserted", [])}
+        return _write_failures(bwe, duplicate_message), inserted
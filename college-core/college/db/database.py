@@ -4,6 +4,7 @@ from pymongo.asynchronous.collection import AsyncCollection
 import asyncio
 from college.core.config import config
 from college.core.logging_config import app_logger
+from college.db.indexes import sync_indexes
 
 
 class DatabaseConnection:
@@ -27,6 +28,7 @@ class DatabaseConnection:
             self.client= None
             self.db = None
             self._connected = False
+            self._supports_transactions = None
 
     async def connect(self):
         if self._connected:
@@ -51,6 +53,7 @@ class DatabaseConnection:
                     app_logger.info(
                         f'Connected to MongoDB at {self.database_url} | using database {self.database_name}')
                     self._connected = True
+                    await self.ensure_indexes()
                     return
 
             except (ValueError, Exception) as e:
@@ -65,12 +68,28 @@ class DatabaseConnection:
                 print(f"Retrying in {delay} seconds...")
                 await asyncio.sleep(delay)
 
+    async def ensure_indexes(self):
+        try:
+            await sync_indexes(self)
+        except Exception as e:
+            app_logger.error(f'Index reconciliation failed: {str(e)}')
+
+    async def supports_transactions(self) -> bool:
+        """Transactions need a replica set or sharded cluster; a standalone mongod has none."""
+        if self._supports_transactions is None:
+            hello = await self.db.command("hello")
+            self._supports_transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+            if not self._supports_transactions:
+                app_logger.warning(f'{self.database_name} runs on a standalone server; writes are not transactional')
+        return self._supports_transactions
+
     async def close(self):
         if self.client:
             await self.client.close()
             self.client = None
             self.db = None
             self._connected = False
+            self._supports_transactions = None
             app_logger.info(f'Connection to {self.database_name} closed.')
             print(f"Connection to {self.database_name} closed.")
         else:
@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import json
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import PyMongoError
+from college.core.logging_config import app_logger
+
+
+# Declared indexes per collection. DatabaseConnection.connect() creates any
+# that are missing; undeclared indexes are only reported, never dropped,
+# unless sync_indexes() is asked to.
+INDEX_REGISTRY: dict[str, list[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("role", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("import_key", ASCENDING)], unique=True, sparse=True),
+    ],
+    "students": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING)]),
+        IndexModel([("program_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("batch_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("adm_year", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("import_key", ASCENDING)], unique=True, sparse=True),
+    ],
+    "faculties": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING)]),
+        IndexModel([("program_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("import_key", ASCENDING)], unique=True, sparse=True),
+    ],
+    "courses": [
+        IndexModel([("course_code", ASCENDING)], unique=True),
+        IndexModel([("program_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("semester", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("import_key", ASCENDING)], unique=True, sparse=True),
+    ],
+    "batches": [
+        IndexModel([("program_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("faculty_in_charge", ASCENDING)]),
+        IndexModel([("semester", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("import_key", ASCENDING)], unique=True, sparse=True),
+    ],
+    "programs": [
+        IndexModel([("status", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("import_key", ASCENDING)], unique=True, sparse=True),
+    ],
+    "course_assignment": [
+        IndexModel([("course_id", ASCENDING)]),
+        IndexModel([("faculty_id", ASCENDING)]),
+    ],
+    "course_assignment_history": [
+        IndexModel([("course_id", ASCENDING)]),
+    ],
+    "import_jobs": [
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)]),
+        IndexModel([("kind", ASCENDING), ("_id", ASCENDING)]),
+    ],
+}
+
+# Queries issued on hot paths, checked with explain() to confirm they are
+# served by an index: (label, collection, filter)
+HOT_QUERIES: list[tuple[str, str, dict]] = [
+    ("UserMgr.verify_user_login", "users", {"email": "probe@example.com"}),
+    ("UserMgr.find_existing_emails?students", "students", {"email": {"$in": ["probe@example.com"]}}),
+    ("UserMgr.find_existing_emails?faculties", "faculties", {"email": {"$in": ["probe@example.com"]}}),
+    ("StudentMgr.get_student_by_user_id", "students", {"user_id": "probe"}),
+    ("FacultyMgr.get_faculty_by_user_id", "faculties", {"user_id": "probe"}),
+    ("CourseMgr.find_existing_course_codes", "courses", {"course_code": {"$in": ["probe"]}}),
+    ("ProgramMgr.get_programs_by_status", "programs", {"status": "Active"}),
+    ("MappingMgr.get_course_assignments", "course_assignment", {"course_id": "probe"}),
+    ("StudentMgr.get_all_students?program_id", "students", {"program_id": "probe"}),
+    ("StudentMgr.get_all_students?batch_id", "students", {"batch_id": "probe"}),
+    ("StudentMgr.get_all_students?adm_year", "students", {"adm_year": "2024"}),
+]
+
+_INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+def _index_key(key) -> tuple:
+    items = key.items() if hasattr(key, "items") else key
+    return tuple((field, direction) for field, direction in items)
+
+
+def _index_options(spec: dict) -> dict:
+    options = {name: spec[name] for name in _INDEX_OPTIONS if name in spec}
+    if not options.get("unique"):
+        options.pop("unique", None)
+    if not options.get("sparse"):
+        options.pop("sparse", None)
+    return options
+
+
+async def diff_indexes(db) -> dict:
+    """Compare declared indexes against the ones present on each collection."""
+    report = {}
+    for collection_name, models in INDEX_REGISTRY.items():
+        collection = db.get_collection_reference(collection_name)
+        existing = await collection.index_information()
+        existing_by_key = {
+            _index_key(info["key"]): (name, _index_options(info))
+            for name, info in existing.items()
+        }
+        declared_keys = set()
+        missing, conflicting = [], []
+        for model in models:
+            spec = model.document
+            key = _index_key(spec["key"])
+            declared_keys.add(key)
+            if key not in existing_by_key:
+                missing.append(spec["name"])
+                continue
+            name, options = existing_by_key[key]
+            if options != _index_options(spec):
+                conflicting.append({
+                    "name": name,
+                    "declared": _index_options(spec),
+                    "actual": options,
+                })
+        extra = [
+            name for key, (name, _) in existing_by_key.items()
+            if key not in declared_keys and name != "_id_"
+        ]
+        report[collection_name] = {
+            "missing": missing,
+            "conflicting": conflicting,
+            "extra": extra,
+        }
+    return report
+
+
+async def sync_indexes(db, drop_extra: bool = False) -> dict:
+    """Create missing declared indexes, optionally dropping undeclared ones."""
+    report = await diff_indexes(db)
+    for collection_name, diff in report.items():
+        collection = db.get_collection_reference(collection_name)
+        if diff["missing"]:
+            models = [
+                model for model in INDEX_REGISTRY[collection_name]
+                if model.document["name"] in diff["missing"]
+            ]
+            try:
+                created = await collection.create_indexes(models)
+                app_logger.info(
+                    f'Created indexes {created} on {collection_name}')
+            except PyMongoError as e:
+                app_logger.error(
+                    f'Failed to create indexes on {collection_name}: {str(e)}')
+        for conflict in diff["conflicting"]:
+            app_logger.warning(
+                f'Index {conflict["name"]} on {collection_name} differs from registry: {conflict}')
+        if drop_extra:
+            for name in diff["extra"]:
+                await collection.drop_index(name)
+                app_logger.info(f'Dropped index {name} on {collection_name}')
+    return report
+
+
+def _plan_stages(plan) -> list:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(_plan_stages(value))
+    return stages
+
+
+async def explain_hot_queries(db) -> list:
+    """Run explain() on every hot query and report the winning plan stages."""
+    results = []
+    for label, collection_name, query in HOT_QUERIES:
+        collection = db.get_collection_reference(collection_name)
+        plan = await collection.find(query).explain()
+        stages = _plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {}))
+        results.append({
+            "query": label,
+            "collection": collection_name,
+            "stages": stages,
+            "uses_index": any("IXSCAN" in stage or stage == "IDHACK" for stage in stages),
+        })
+    return results
+
+
+async def index_report(db) -> dict:
+    return {
+        "indexes": await diff_indexes(db),
+        "queries": await explain_hot_queries(db),
+    }
+
+
+async def _main(args):
+    from college.db.database import get_db
+
+    db = get_db()
+    await db.connect()
+    try:
+        if args.sync:
+            await sync_indexes(db, drop_extra=args.drop_extra)
+        report = await index_report(db)
+    finally:
+        await db.close()
+    print(json.dumps(report, indent=2))
+    healthy = all(
+        not diff["missing"] and not diff["conflicting"] for diff in report["indexes"].values()
+    ) and all(query["uses_index"] for query in report["queries"])
+    return 0 if healthy else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Diff declared MongoDB indexes against the database and explain hot queries.")
+    parser.add_argument("--sync", action="store_true",
+                        help="create missing indexes before reporting")
+    parser.add_argument("--drop-extra", action="store_true",
+                        help="with --sync, drop indexes that are not in the registry")
+    raise SystemExit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,103 @@
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+
+VERSION_FIELD = "version"
+
+
+def build_update(data: dict, unset_empty: bool = True) -> dict:
+    """Turn a model dump into an update document.
+
+    Empty values ("" or None) are removed with $unset unless ``unset_empty``
+    is False, in which case every field is $set. ``updated_at`` is stamped
+    and the document's version is bumped.
+    """
+    set_data = {}
+    unset_data = {}
+    for key, value in data.items():
+        if unset_empty and (value == "" or value is None):
+            unset_data[key] = ""
+        else:
+            set_data[key] = value
+    set_data["updated_at"] = datetime.now()
+
+    update_query = {"$set": set_data, "$inc": {VERSION_FIELD: 1}}
+    if unset_data:
+        update_query["$unset"] = unset_data
+    return update_query
+
+
+async def update_and_fetch(collection, document_id: str, update: dict,
+                           expected_version: Optional[int] = None,
+                           return_document: bool = ReturnDocument.AFTER, **kwargs) -> Optional[dict]:
+    """Apply ``update`` to one document and return it as updated, in one round trip.
+
+    With ``return_document=ReturnDocument.BEFORE`` the document is returned
+    as it was before the update instead.
+
+    Returns None when there is no document with that id. With
+    ``expected_version`` the update only applies while the document is still
+    at that version (documents written before versioning count as 0);
+    otherwise it raises 409 and the caller should re-read before retrying.
+    """
+    query = _version_query(document_id, expected_version)
+    doc = await collection.find_one_and_update(
+        query, update, return_document=return_document, **kwargs)
+    return await _found_or_stale(collection, query, doc, expected_version)
+
+
+async def find_at_version(collection, document_id: str, expected_version: Optional[int] = None,
+                          **kwargs) -> Optional[dict]:
+    """Read one document, checking it is still at ``expected_version`` without writing it.
+
+    For requests that depend on a document but do not change it, so they
+    leave its version alone. Missing and stale documents are handled as in
+    update_and_fetch.
+    """
+    query = _version_query(document_id, expected_version)
+    doc = await collection.find_one(query, **kwargs)
+    return await _found_or_stale(collection, query, doc, expected_version)
+
+
+def _version_query(document_id: str, expected_version: Optional[int]) -> dict:
+    query = {"_id": ObjectId(document_id)}
+    if expected_version is not None:
+        query[VERSION_FIELD] = expected_version if expected_version else {"$in": [0, None]}
+    return query
+
+
+async def _found_or_stale(collection, query: dict, doc: Optional[dict],
+                          expected_version: Optional[int]) -> Optional[dict]:
+    if doc is None:
+        # Only a failed conditional match pays for telling "missing" and "stale" apart
+        if expected_version is not None and await collection.count_documents({"_id": query["_id"]}, limit=1):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="Document was modified by another request")
+        return None
+    doc["_id"] = str(doc["_id"])
+    return doc
+
+
+def selection_query(ids: Optional[list], filters: Optional[dict]) -> dict:
+    """Match the documents picked by a bulk request: an id list or field filters."""
+    if ids is None:
+        return dict(filters or {})
+    if not all(ObjectId.is_valid(document_id) for document_id in ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid id in ids")
+    return {"_id": {"$in": [ObjectId(document_id) for document_id in ids]}}
+
+
+async def update_selected(collection, query: dict, changes: dict,
+                          increment: Optional[dict] = None, **kwargs) -> dict:
+    """Apply one change set to every matching document with a single update_many.
+
+    ``changes`` follow build_update (empty values are unset) and
+    ``increment`` adds to numeric fields server-side, e.g. a semester
+    promotion. Returns the matched and modified counts.
+    """
+    update = build_update(changes)
+    update["$inc"].update(increment or {})
+    result = await collection.update_many(query, update, **kwargs)
+    return {"matched": result.matched_count, "modified": result.modified_count}
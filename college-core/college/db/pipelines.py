@@ -0,0 +1,26 @@
+def stringify_id(field: str = "_id") -> dict:
+    """Stage that renders an ObjectId field as a string, like the managers do in Python."""
+    return {"$set": {field: {"$toString": f"${field}"}}}
+
+
+def lookup_by_id(from_collection: str, local_field: str, as_field: str) -> list:
+    """Stages that embed the document referenced by a string id field.
+
+    References such as ``program_id`` are stored as strings while the target
+    ``_id`` is an ObjectId, so the reference is converted first. Malformed or
+    dangling references leave ``as_field`` unset instead of failing the query.
+    """
+    ref_field = f"_{as_field}_oid"
+    return [
+        {"$set": {ref_field: {"$convert": {
+            "input": f"${local_field}", "to": "objectId", "onError": None, "onNull": None}}}},
+        {"$lookup": {
+            "from": from_collection,
+            "localField": ref_field,
+            "foreignField": "_id",
+            "pipeline": [stringify_id()],
+            "as": as_field,
+        }},
+        {"$set": {as_field: {"$first": f"${as_field}"}}},
+        {"$unset": ref_field},
+    ]
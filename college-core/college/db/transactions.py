@@ -0,0 +1,30 @@
+from typing import Awaitable, Callable, Optional, TypeVar
+from pymongo.asynchronous.client_session import AsyncClientSession
+from college.db.database import DatabaseConnection
+
+T = TypeVar("T")
+
+
+class RejectedRows(Exception):
+    """Raised inside a transaction to abort it because some rows cannot be written.
+
+    ``failures`` maps row positions to their error, like the bulk helpers.
+    """
+
+    def __init__(self, failures: dict):
+        super().__init__(f"{len(failures)} rows rejected")
+        self.failures = failures
+
+
+async def run_in_transaction(db: DatabaseConnection,
+                             callback: Callable[[Optional[AsyncClientSession]], Awaitable[T]]) -> T:
+    """Run ``callback(session)`` inside a transaction and return its result.
+
+    The driver retries the callback on transient errors, so it must be safe
+    to run more than once. On a standalone server, which has no
+    transactions, the callback runs once with ``session=None`` instead.
+    """
+    if not await db.supports_transactions():
+        return await callback(None)
+    async with db.client.start_session() as session:
+        return await session.with_transaction(callback)
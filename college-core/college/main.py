@@ -1,9 +1,13 @@
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI, Response
+from college.background_tasks.workers import ImportWorkerPool
+from college.core.config import config
 from college.db.database import get_db
-from college.routes import auth, batch, course, faculty, program, student, user
+from college.services.import_services import shutdown_import_pool
+from college.routes import admin, auth, batch, course, faculty, imports, program, student, user
 from college.utils.request_logging_middleware import RequestLoggingMiddleware
+from college.utils.request_scope_middleware import RequestScopeMiddleware
 from college.core.logging_config import app_logger
 
 db = get_db()
@@ -12,8 +16,13 @@ db = get_db()
 async def lifespan(app: FastAPI):
     app_logger.info("FastAPI app started")
     await db.connect()
+    import_workers = ImportWorkerPool(db)
+    if config.IMPORT_JOB_CONCURRENCY > 0:
+        import_workers.start()
     app_logger.info("App Startup Complete")
     yield
+    await import_workers.stop()
+    shutdown_import_pool()
     await db.close()
     app_logger.info("FastAPI app stopped")
 
@@ -34,6 +43,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.add_middleware(RequestLoggingMiddleware)
+app.add_middleware(RequestScopeMiddleware)
 
 app.include_router(program.router, prefix="/program", tags=["Program"])
 app.include_router(course.router, prefix="/course", tags=["Course"])
@@ -42,6 +52,8 @@ app.include_router(faculty.router, prefix="/faculty", tags=["Faculty"])
 app.include_router(batch.router, prefix="/batch", tags=["Batch"])
 app.include_router(user.router, prefix="/user", tags=["User"])
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+app.include_router(imports.router, prefix="/imports", tags=["Import"])
 
 @app.get("/")
 async def root():
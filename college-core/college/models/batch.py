@@ -1,5 +1,6 @@
 from typing import Literal, Optional
 from pydantic import BaseModel
+from college.models.bulk import BulkUpdate
 
 
 class Batch(BaseModel):
@@ -9,4 +10,26 @@ class Batch(BaseModel):
     semester: Optional[int] = None
     start_date: Optional[str] = None
     end_date: Optional[str] = None
-    status: Literal["Active", "Inactive", "Deleted"] = "Active"
\ No newline at end of file
+    status: Literal["Active", "Inactive", "Deleted"] = "Active"
+
+
+class BatchFilters(BaseModel):
+    program_id: Optional[str] = None
+    semester: Optional[int] = None
+    status: Optional[Literal["Active", "Inactive", "Deleted"]] = None
+
+
+class BatchBulkChanges(BaseModel):
+    faculty_in_charge: Optional[str] = None
+    program_id: Optional[str] = None
+    semester: Optional[int] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    status: Optional[Literal["Active", "Inactive", "Deleted"]] = None
+
+
+class BatchBulkUpdate(BulkUpdate):
+    filters: Optional[BatchFilters] = None
+    changes: BatchBulkChanges = BatchBulkChanges()
+    # e.g. {"semester": 1} promotes every selected batch by one semester
+    increment: dict[Literal["semester"], int] = {}
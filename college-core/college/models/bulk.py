@@ -0,0 +1,28 @@
+from typing import Optional
+from pydantic import BaseModel, model_validator
+
+
+class BulkUpdate(BaseModel):
+    """Selects documents by ``ids`` or by ``filters``, never both.
+
+    Subclasses declare ``filters`` and ``changes``, and optionally
+    ``increment`` for numeric fields that move relative to their value.
+    """
+    ids: Optional[list[str]] = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        filters = getattr(self, "filters", None)
+        if (self.ids is None) == (filters is None):
+            raise ValueError("Select documents with either ids or filters")
+        if self.ids is not None and not self.ids:
+            raise ValueError("ids must not be empty")
+        if filters is not None and not filters.model_dump(exclude_none=True):
+            raise ValueError("filters must match on at least one field")
+        changes = self.changes.model_dump(exclude_unset=True)
+        increment = getattr(self, "increment", {})
+        if not changes and not increment:
+            raise ValueError("Nothing to update")
+        if set(changes) & set(increment):
+            raise ValueError("A field cannot be both changed and incremented")
+        return self
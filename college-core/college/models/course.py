@@ -1,5 +1,6 @@
 from typing import Literal, Optional
 from pydantic import BaseModel
+from college.models.bulk import BulkUpdate
 
 
 class Course(BaseModel):
@@ -7,4 +8,22 @@ class Course(BaseModel):
     course_name: str
     semester: int
     program_id: Optional[str] = None
-    status: Literal["Active", "Inactive", "Deleted"] = "Active"
\ No newline at end of file
+    status: Literal["Active", "Inactive", "Deleted"] = "Active"
+
+
+class CourseFilters(BaseModel):
+    program_id: Optional[str] = None
+    semester: Optional[int] = None
+    status: Optional[Literal["Active", "Inactive", "Deleted"]] = None
+
+
+class CourseBulkChanges(BaseModel):
+    program_id: Optional[str] = None
+    semester: Optional[int] = None
+    status: Optional[Literal["Active", "Inactive", "Deleted"]] = None
+
+
+class CourseBulkUpdate(BulkUpdate):
+    filters: Optional[CourseFilters] = None
+    changes: CourseBulkChanges = CourseBulkChanges()
+    increment: dict[Literal["semester"], int] = {}
@@ -1,6 +1,7 @@
 from datetime import date
 from typing import Annotated, Literal, Optional
 from pydantic import BaseModel, EmailStr, constr
+from college.models.bulk import BulkUpdate
 
 
 class Faculty(BaseModel):
@@ -32,3 +33,18 @@ class FacultyUpdate(BaseModel):
     end_date: Optional[date] = None
     program_id: Optional[str] = None
     status: Optional[Literal["Active", "Resigned"]] = None
+
+
+class FacultyFilters(BaseModel):
+    program_id: Optional[str] = None
+    status: Optional[Literal["Active", "Resigned"]] = None
+
+
+class FacultyBulkChanges(BaseModel):
+    program_id: Optional[str] = None
+    status: Optional[Literal["Active", "Resigned"]] = None
+
+
+class FacultyBulkUpdate(BulkUpdate):
+    filters: Optional[FacultyFilters] = None
+    changes: FacultyBulkChanges
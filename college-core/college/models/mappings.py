@@ -1,8 +1,12 @@
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class CourseAssignment(BaseModel):
     course_id: str
     batch_id: Optional[str] = None
     faculty_id: str
+
+
+class BulkCourseAssignment(BaseModel):
+    assignments: list[CourseAssignment] = Field(min_length=1, max_length=1000)
@@ -0,0 +1,9 @@
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class PageParams(BaseModel):
+    limit: Optional[int] = Field(default=None, ge=1, le=500)
+    cursor: Optional[str] = None
+    sort: Literal["_id", "updated_at"] = "_id"
+    order: Literal["asc", "desc"] = "asc"
@@ -1,6 +1,7 @@
 from datetime import date
 from typing import Annotated, Literal, Optional
 from pydantic import BaseModel, EmailStr, constr
+from college.models.bulk import BulkUpdate
 
 
 class Student(BaseModel):
@@ -37,4 +38,23 @@ class StudentUpdate(BaseModel):
     program_id: Optional[str] = None
     adm_year: Optional[str] = None
     batch_id: Optional[str] = None
-    status: Optional[Literal["Active","Discontinued","Completed"]] = None
\ No newline at end of file
+    status: Optional[Literal["Active","Discontinued","Completed"]] = None
+
+
+class StudentFilters(BaseModel):
+    program_id: Optional[str] = None
+    batch_id: Optional[str] = None
+    status: Optional[Literal["Active", "Discontinued", "Completed"]] = None
+    adm_year: Optional[str] = None
+
+
+class StudentBulkChanges(BaseModel):
+    program_id: Optional[str] = None
+    batch_id: Optional[str] = None
+    adm_year: Optional[str] = None
+    status: Optional[Literal["Active", "Discontinued", "Completed"]] = None
+
+
+class StudentBulkUpdate(BulkUpdate):
+    filters: Optional[StudentFilters] = None
+    changes: StudentBulkChanges
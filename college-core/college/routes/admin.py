@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query
+
+from college.db.database import DatabaseConnection, get_db
+from college.services.admin_services import AdminMgr
+
+
+router = APIRouter()
+
+
+async def get_admin_mgr(db: DatabaseConnection = Depends(get_db)) -> AdminMgr:
+    await db.connect()
+    return AdminMgr(db)
+
+
+@router.get("/indexes/")
+async def get_index_report(admin_mgr: AdminMgr = Depends(get_admin_mgr)):
+    try:
+        return await admin_mgr.get_index_report()
+    except Exception as e:
+        raise (e)
+
+
+@router.post("/indexes/sync/")
+async def sync_indexes(drop_extra: bool = Query(False), admin_mgr: AdminMgr = Depends(get_admin_mgr)):
+    try:
+        return await admin_mgr.sync_indexes(drop_extra)
+    except Exception as e:
+        raise (e)
+
+
+@router.get("/cache/")
+async def get_cache_stats(admin_mgr: AdminMgr = Depends(get_admin_mgr)):
+    try:
+        return admin_mgr.get_cache_stats()
+    except Exception as e:
+        raise (e)
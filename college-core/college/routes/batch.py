@@ -1,12 +1,16 @@
-import os
-import uuid
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile, status
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
-from college.background_tasks.tasks import process_batch_csv
 from college.db.database import DatabaseConnection, get_db
-from college.models.batch import Batch
+from college.models.batch import Batch, BatchBulkUpdate
+from college.models.pagination import PageParams
 from college.services.batch_services import BatchMgr
-from college.utils.utilities import PROGRESS_TRACKER
+from college.routes.imports import get_import_job_mgr
+from college.services.import_job_services import ImportJobMgr
+from college.utils.versioning import get_expected_version
+from college.utils.pagination import build_filters, get_page_params
+from college.utils.streaming import StreamFormat, streaming_response
+from college.utils.uploads import UPLOAD_OPENAPI, save_upload
 
 
 router = APIRouter()
@@ -32,9 +36,17 @@ async def create_batch(batch: Batch, batch_mgr: BatchMgr = Depends(get_batch_mgr
 
 
 @router.get("/")
-async def get_batches(batch_mgr: BatchMgr = Depends(get_batch_mgr)):
+async def get_batches(program_id: Optional[str] = Query(None),
+                      semester: Optional[int] = Query(None),
+                      batch_status: Optional[Literal["Active", "Inactive", "Deleted"]] = Query(None, alias="status"),
+                      page: PageParams = Depends(get_page_params),
+                      stream: Optional[StreamFormat] = Query(None),
+                      batch_mgr: BatchMgr = Depends(get_batch_mgr)):
     try:
-        batch_data = await batch_mgr.get_all_batches()
+        filters = build_filters(program_id=program_id, semester=semester, status=batch_status)
+        if stream:
+            return streaming_response(batch_mgr.iter_batches(filters), stream)
+        batch_data = await batch_mgr.get_all_batches(filters, page)
         return batch_data
     except Exception as e:
         raise (e)
@@ -52,50 +64,41 @@ async def delete_batch(batch_id: str, batch_mgr: BatchMgr = Depends(get_batch_mg
         raise e
 
 
-@router.post("/upload/")
-async def upload_batches(background_tasks: BackgroundTasks, file: UploadFile = File(...),):
-    if not file.filename or not file.filename.endswith((".csv", ".xlsx")):
-        raise HTTPException(
-            status_code=400, detail="Only CSV or Excel files are supported"
-        )
-
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    UPLOADS_DIR = os.path.join(BASE_DIR, "..", "uploads")
-    UPLOADS_DIR = os.path.abspath(UPLOADS_DIR)
-
-    os.makedirs(UPLOADS_DIR, exist_ok=True)
-
-    file_id = uuid.uuid4().hex
-    filename = f"{file_id}_{file.filename}"
-    file_path = os.path.join(UPLOADS_DIR, filename)
-
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+@router.post("/upload/", openapi_extra=UPLOAD_OPENAPI)
+async def upload_batches(request: Request,
+                         dry_run: bool = Query(False),
+                         batch_mgr: BatchMgr = Depends(get_batch_mgr),
+                         job_mgr: ImportJobMgr = Depends(get_import_job_mgr)):
+    try:
+        upload = await save_upload(request, BatchMgr.IMPORT_COLUMNS)
+        if dry_run:
+            return await batch_mgr.validate_batch_csv(upload["file_path"])
+        job_id = await job_mgr.enqueue("batch", upload)
+        return {"message": "File is saved for processing", "job_id": job_id}
+    except Exception as e:
+        raise (e)
 
-    PROGRESS_TRACKER[file_id] = {
-        "progress": 0,
-        "status": "processing",
-        "error_file": None,
-        "total": 0,
-        "processed": 0,
-        "successfull": 0,
-        "failed": 0
-    }
 
-    background_tasks.add_task(process_batch_csv, file_path, file_id)
-    return {"message": "File is saved for processing"}
+@router.patch("/bulk/")
+async def bulk_update_batches(request: BatchBulkUpdate, batch_mgr: BatchMgr = Depends(get_batch_mgr)):
+    try:
+        result = await batch_mgr.bulk_update_batches(request)
+        return {"message": "Batch Bulk Update Applied", **result}
+    except Exception as e:
+        raise (e)
 
 
 @router.patch("/{batch_id}/")
-async def update_batch(batch_id: str, batch: Batch, batch_mgr: BatchMgr = Depends(get_batch_mgr)):
+async def update_batch(batch_id: str, batch: Batch,
+                       expected_version: Optional[int] = Depends(get_expected_version),
+                       batch_mgr: BatchMgr = Depends(get_batch_mgr)):
     try:
-        result = await batch_mgr.update_batch_in_db(batch_id, batch)
-        if result == 0:
+        result = await batch_mgr.update_batch_in_db(batch_id, batch, expected_version)
+        if result is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Course not found",
             )
-        return {"message": "Course Updated Successfully"}
+        return {"message": "Course Updated Successfully", "batch": result}
     except Exception as e:
         raise (e)
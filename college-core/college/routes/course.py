@@ -1,14 +1,18 @@
-import os
-import uuid
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile, status
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
-from college.background_tasks.tasks import process_course_csv
 from college.db.database import DatabaseConnection, get_db
-from college.models.course import Course
-from college.models.mappings import CourseAssignment
+from college.models.course import Course, CourseBulkUpdate
+from college.models.mappings import BulkCourseAssignment, CourseAssignment
+from college.models.pagination import PageParams
 from college.services.course_services import CourseMgr
 from college.services.mapping_services import MappingMgr
-from college.utils.utilities import PROGRESS_TRACKER
+from college.routes.imports import get_import_job_mgr
+from college.services.import_job_services import ImportJobMgr
+from college.utils.versioning import get_expected_version
+from college.utils.pagination import build_filters, get_page_params
+from college.utils.streaming import StreamFormat, streaming_response
+from college.utils.uploads import UPLOAD_OPENAPI, save_upload
 
 
 router = APIRouter()
@@ -38,24 +42,43 @@ async def create_course(course: Course, course_mgr: CourseMgr = Depends(get_cour
 
 
 @router.get("/")
-async def get_courses(course_mgr: CourseMgr = Depends(get_course_mgr)):
+async def get_courses(program_id: Optional[str] = Query(None),
+                      semester: Optional[int] = Query(None),
+                      course_status: Optional[Literal["Active", "Inactive", "Deleted"]] = Query(None, alias="status"),
+                      page: PageParams = Depends(get_page_params),
+                      stream: Optional[StreamFormat] = Query(None),
+                      course_mgr: CourseMgr = Depends(get_course_mgr)):
     try:
-        course_data = await course_mgr.get_all_courses()
+        filters = build_filters(program_id=program_id, semester=semester, status=course_status)
+        if stream:
+            return streaming_response(course_mgr.iter_courses(filters), stream)
+        course_data = await course_mgr.get_all_courses(filters, page)
         return course_data
     except Exception as e:
         raise (e)
 
 
+@router.patch("/bulk/")
+async def bulk_update_courses(request: CourseBulkUpdate, course_mgr: CourseMgr = Depends(get_course_mgr)):
+    try:
+        result = await course_mgr.bulk_update_courses(request)
+        return {"message": "Course Bulk Update Applied", **result}
+    except Exception as e:
+        raise (e)
+
+
 @router.patch("/{course_id}/")
-async def update_course(course_id: str, course: Course, course_mgr: CourseMgr = Depends(get_course_mgr)):
+async def update_course(course_id: str, course: Course,
+                        expected_version: Optional[int] = Depends(get_expected_version),
+                        course_mgr: CourseMgr = Depends(get_course_mgr)):
     try:
-        result = await course_mgr.update_course_in_db(course_id, course)
-        if result == 0:
+        result = await course_mgr.update_course_in_db(course_id, course, expected_version)
+        if result is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Course not found",
             )
-        return {"message": "Course Updated Successfully"}
+        return {"message": "Course Updated Successfully", "course": result}
     except Exception as e:
         raise (e)
 
@@ -81,10 +104,21 @@ async def get_course_by_id(course_id: str, course_mgr: CourseMgr = Depends(get_c
     except Exception as e:
         raise (e)
 
+@router.post("/assign/")
+async def assign_courses(request: BulkCourseAssignment, course_mgr: CourseMgr = Depends(get_course_mgr)):
+    try:
+        assignment_ids = await course_mgr.assign_courses(request.assignments)
+        return {"message": "Courses Assigned Successfully", "assignment_ids": assignment_ids}
+    except Exception as e:
+        raise (e)
+
+
 @router.post("/{course_id}/assign/")
-async def assign_course(course_id: str, assignment_data: CourseAssignment, course_mgr: CourseMgr = Depends(get_course_mgr)):
+async def assign_course(course_id: str, assignment_data: CourseAssignment,
+                        expected_version: Optional[int] = Depends(get_expected_version),
+                        course_mgr: CourseMgr = Depends(get_course_mgr)):
     try:
-        result = await course_mgr.assign_course(course_id, assignment_data)
+        result = await course_mgr.assign_course(course_id, assignment_data, expected_version)
         if not result:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -94,36 +128,16 @@ async def assign_course(course_id: str, assignment_data: CourseAssignment, cours
     except Exception as e:
         raise (e)
 
-@router.post("/upload/")
-async def upload_courses(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
-    if not file.filename or not file.filename.endswith((".csv", ".xlsx")):
-        raise HTTPException(
-            status_code=400, detail="Only CSV or Excel files are supported"
-        )
-
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    UPLOADS_DIR = os.path.join(BASE_DIR, "..", "uploads")
-    UPLOADS_DIR = os.path.abspath(UPLOADS_DIR)
-
-    os.makedirs(UPLOADS_DIR, exist_ok=True)
-
-    file_id = uuid.uuid4().hex
-    filename = f"{file_id}_{file.filename}"
-    file_path = os.path.join(UPLOADS_DIR, filename)
-
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-
-    PROGRESS_TRACKER[file_id] = {
-        "progress": 0,
-        "status": "processing",
-        "error_file": None,
-        "total": 0,
-        "processed": 0,
-        "successfull": 0,
-        "failed": 0
-    }
-
-    background_tasks.add_task(process_course_csv, file_path, file_id)
-    return {"message": "File is saved for processing"}
\ No newline at end of file
+@router.post("/upload/", openapi_extra=UPLOAD_OPENAPI)
+async def upload_courses(request: Request,
+                         dry_run: bool = Query(False),
+                         course_mgr: CourseMgr = Depends(get_course_mgr),
+                         job_mgr: ImportJobMgr = Depends(get_import_job_mgr)):
+    try:
+        upload = await save_upload(request, CourseMgr.IMPORT_COLUMNS)
+        if dry_run:
+            return await course_mgr.validate_course_csv(upload["file_path"])
+        job_id = await job_mgr.enqueue("course", upload)
+        return {"message": "File is saved for processing", "job_id": job_id}
+    except Exception as e:
+        raise (e)
\ No newline at end of file
@@ -1,12 +1,16 @@
-import os
-import uuid
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile, status
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
-from college.background_tasks.tasks import process_faculty_csv
 from college.db.database import DatabaseConnection, get_db
-from college.models.faculty import Faculty, FacultyUpdate
+from college.models.faculty import Faculty, FacultyUpdate, FacultyBulkUpdate
+from college.models.pagination import PageParams
 from college.services.faculty_services import FacultyMgr
-from college.utils.utilities import PROGRESS_TRACKER
+from college.routes.imports import get_import_job_mgr
+from college.services.import_job_services import ImportJobMgr
+from college.utils.versioning import get_expected_version
+from college.utils.pagination import build_filters, get_page_params
+from college.utils.streaming import StreamFormat, streaming_response
+from college.utils.uploads import UPLOAD_OPENAPI, save_upload
 
 
 router = APIRouter()
@@ -18,9 +22,16 @@ async def get_faculty_mgr(db: DatabaseConnection = Depends(get_db)) -> FacultyMg
 
 
 @router.get("/")
-async def get_faculties(faculty_mgr: FacultyMgr = Depends(get_faculty_mgr)):
+async def get_faculties(program_id: Optional[str] = Query(None),
+                        faculty_status: Optional[Literal["Active", "Resigned"]] = Query(None, alias="status"),
+                        page: PageParams = Depends(get_page_params),
+                        stream: Optional[StreamFormat] = Query(None),
+                        faculty_mgr: FacultyMgr = Depends(get_faculty_mgr)):
     try:
-        faculty_data = await faculty_mgr.get_all_faculties()
+        filters = build_filters(program_id=program_id, status=faculty_status)
+        if stream:
+            return streaming_response(faculty_mgr.iter_faculties(filters), stream)
+        faculty_data = await faculty_mgr.get_all_faculties(filters, page)
         return faculty_data
     except Exception as e:
         raise (e)
@@ -40,39 +51,19 @@ async def create_faculty(faculty: Faculty, faculty_mgr: FacultyMgr = Depends(get
         raise (e)
 
 
-@router.post("/upload/")
-async def upload_faculties(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
-    if not file.filename or not file.filename.endswith((".csv", ".xlsx")):
-        raise HTTPException(
-            status_code=400, detail="Only CSV or Excel files are supported"
-        )
-
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    UPLOADS_DIR = os.path.join(BASE_DIR, "..", "uploads")
-    UPLOADS_DIR = os.path.abspath(UPLOADS_DIR)
-
-    os.makedirs(UPLOADS_DIR, exist_ok=True)
-
-    file_id = uuid.uuid4().hex
-    filename = f"{file_id}_{file.filename}"
-    file_path = os.path.join(UPLOADS_DIR, filename)
-
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-
-    PROGRESS_TRACKER[file_id] = {
-        "progress": 0,
-        "status": "processing",
-        "error_file": None,
-        "total": 0,
-        "processed": 0,
-        "successfull": 0,
-        "failed": 0
-    }
-
-    background_tasks.add_task(process_faculty_csv, file_path, file_id)
-    return {"message": "File is saved for processing"}
+@router.post("/upload/", openapi_extra=UPLOAD_OPENAPI)
+async def upload_faculties(request: Request,
+                           dry_run: bool = Query(False),
+                           faculty_mgr: FacultyMgr = Depends(get_faculty_mgr),
+                           job_mgr: ImportJobMgr = Depends(get_import_job_mgr)):
+    try:
+        upload = await save_upload(request, FacultyMgr.IMPORT_COLUMNS)
+        if dry_run:
+            return await faculty_mgr.validate_faculty_csv(upload["file_path"])
+        job_id = await job_mgr.enqueue("faculty", upload)
+        return {"message": "File is saved for processing", "job_id": job_id}
+    except Exception as e:
+        raise (e)
 
 
 @router.get("/{user_id}/")
@@ -83,16 +74,29 @@ async def get_faculty_by_user_id(user_id: str, faculty_mgr: FacultyMgr = Depends
     except Exception as e:
         raise (e)
 
+@router.patch("/bulk/")
+async def bulk_update_faculties(request: FacultyBulkUpdate, faculty_mgr: FacultyMgr = Depends(get_faculty_mgr)):
+    try:
+        result = await faculty_mgr.bulk_update_faculties(request)
+        return {"message": "Faculty Bulk Update Applied", **result}
+    except Exception as e:
+        raise (e)
+
+
 @router.patch("/{faculty_id}/")
-async def update_faculty(faculty_id: str, faculty: FacultyUpdate, faculty_mgr: FacultyMgr = Depends(get_faculty_mgr)):
+async def update_faculty(faculty_id: str, faculty: FacultyUpdate,
+                         expected_version: Optional[int] = Depends(get_expected_version),
+                         faculty_mgr: FacultyMgr = Depends(get_faculty_mgr)):
     try:
-        result = await faculty_mgr.update_faculty_by_id(faculty_id, faculty)
-        if result == 0:
+        result = await faculty_mgr.update_faculty_by_id(faculty_id, faculty, expected_version)
+        if result is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Faculty not found",
             )
-        return {"message": "Faculty Updated Successfully"}
+        return {"message": "Faculty Updated Successfully", "faculty": result}
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
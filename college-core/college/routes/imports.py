@@ -0,0 +1,55 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import FileResponse
+
+from college.db.database import DatabaseConnection, get_db
+from college.models.pagination import PageParams
+from college.services.import_job_services import (PROGRESS_BROKER, ImportJobMgr, ImportKind, JobStatus,
+                                                   error_file_path)
+from college.utils.pagination import build_filters, get_page_params
+from college.utils.streaming import event_stream_response
+
+
+router = APIRouter()
+
+
+async def get_import_job_mgr(db: DatabaseConnection = Depends(get_db)) -> ImportJobMgr:
+    await db.connect()
+    return ImportJobMgr(db)
+
+
+@router.get("/")
+async def get_import_jobs(kind: Optional[ImportKind] = Query(None),
+                          job_status: Optional[JobStatus] = Query(None, alias="status"),
+                          page: PageParams = Depends(get_page_params),
+                          job_mgr: ImportJobMgr = Depends(get_import_job_mgr)):
+    try:
+        filters = build_filters(kind=kind, status=job_status)
+        return await job_mgr.get_all_jobs(filters, page)
+    except Exception as e:
+        raise (e)
+
+
+@router.get("/errors/{file_name}/")
+async def download_error_file(file_name: str):
+    try:
+        return FileResponse(error_file_path(file_name), media_type="text/csv", filename=file_name)
+    except Exception as e:
+        raise (e)
+
+
+@router.get("/{job_id}/")
+async def get_import_job(job_id: str, job_mgr: ImportJobMgr = Depends(get_import_job_mgr)):
+    try:
+        return await job_mgr.get_job(job_id)
+    except Exception as e:
+        raise (e)
+
+
+@router.get("/{job_id}/events/")
+async def stream_import_events(job_id: str, job_mgr: ImportJobMgr = Depends(get_import_job_mgr)):
+    try:
+        await job_mgr.get_job(job_id)
+        return event_stream_response(PROGRESS_BROKER.subscribe(job_mgr, job_id))
+    except Exception as e:
+        raise (e)
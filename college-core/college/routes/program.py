@@ -1,13 +1,16 @@
-import os
-from typing import Literal
-import uuid
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile, status
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
-from college.background_tasks.tasks import process_program_csv
 from college.db.database import DatabaseConnection, get_db
+from college.models.pagination import PageParams
 from college.models.program import Program
 from college.services.program_services import ProgramMgr
-from college.utils.utilities import PROGRESS_TRACKER
+from college.routes.imports import get_import_job_mgr
+from college.services.import_job_services import ImportJobMgr
+from college.utils.versioning import get_expected_version
+from college.utils.pagination import build_filters, get_page_params
+from college.utils.streaming import StreamFormat, streaming_response
+from college.utils.uploads import UPLOAD_OPENAPI, save_upload
 
 
 router = APIRouter()
@@ -33,23 +36,26 @@ async def create_program(program: Program, program_mgr: ProgramMgr = Depends(get
 
 
 @router.patch("/{program_id}/")
-async def update_program(program_id: str, program: Program, program_mgr: ProgramMgr = Depends(get_program_mgr)):
+async def update_program(program_id: str, program: Program,
+                         expected_version: Optional[int] = Depends(get_expected_version),
+                         program_mgr: ProgramMgr = Depends(get_program_mgr)):
     try:
-        result = await program_mgr.update_program_in_db(program_id, program)
-        if result.modified_count == 0:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Program not found",
-            )
-        return {"message": "Program Updated Successfully"}
+        result = await program_mgr.update_program_in_db(program_id, program, expected_version)
+        return {"message": "Program Updated Successfully", "program": result}
     except Exception as e:
         raise (e)
 
 
 @router.get("/")
-async def get_programs(program_mgr: ProgramMgr = Depends(get_program_mgr)):
+async def get_programs(program_status: Optional[Literal["Active", "Inactive", "Deleted"]] = Query(None, alias="status"),
+                       page: PageParams = Depends(get_page_params),
+                       stream: Optional[StreamFormat] = Query(None),
+                       program_mgr: ProgramMgr = Depends(get_program_mgr)):
     try:
-        program_data = await program_mgr.get_all_programs()
+        filters = build_filters(status=program_status)
+        if stream:
+            return streaming_response(program_mgr.iter_programs(filters), stream)
+        program_data = await program_mgr.get_all_programs(filters, page)
         return program_data
     except Exception as e:
         raise (e)
@@ -78,36 +84,16 @@ async def delete_program(program_id: str, program_mgr: ProgramMgr = Depends(get_
         raise (e)
 
 
-@router.post("/upload/")
-async def upload_programs(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
-    if not file.filename or not file.filename.endswith((".csv", ".xlsx")):
-        raise HTTPException(
-            status_code=400, detail="Only CSV or Excel files are supported"
-        )
-
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    UPLOADS_DIR = os.path.join(BASE_DIR, "..", "uploads")
-    UPLOADS_DIR = os.path.abspath(UPLOADS_DIR)
-
-    os.makedirs(UPLOADS_DIR, exist_ok=True)
-
-    file_id = uuid.uuid4().hex
-    filename = f"{file_id}_{file.filename}"
-    file_path = os.path.join(UPLOADS_DIR, filename)
-
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-
-    PROGRESS_TRACKER[file_id] = {
-        "progress": 0,
-        "status": "processing",
-        "error_file": None,
-        "total": 0,
-        "processed": 0,
-        "successfull": 0,
-        "failed": 0
-    }
-
-    background_tasks.add_task(process_program_csv, file_path, file_id)
-    return {"message": "File is saved for processing"}
\ No newline at end of file
+@router.post("/upload/", openapi_extra=UPLOAD_OPENAPI)
+async def upload_programs(request: Request,
+                          dry_run: bool = Query(False),
+                          program_mgr: ProgramMgr = Depends(get_program_mgr),
+                          job_mgr: ImportJobMgr = Depends(get_import_job_mgr)):
+    try:
+        upload = await save_upload(request, ProgramMgr.IMPORT_COLUMNS)
+        if dry_run:
+            return await program_mgr.validate_program_csv(upload["file_path"])
+        job_id = await job_mgr.enqueue("program", upload)
+        return {"message": "File is saved for processing", "job_id": job_id}
+    except Exception as e:
+        raise (e)
\ No newline at end of file
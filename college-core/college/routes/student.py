@@ -1,12 +1,16 @@
-import os
-import uuid
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile, status
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
-from college.background_tasks.tasks import process_student_csv
 from college.db.database import DatabaseConnection, get_db
-from college.models.student import Student, StudentUpdate
+from college.models.pagination import PageParams
+from college.models.student import Student, StudentUpdate, StudentBulkUpdate
 from college.services.student_services import StudentMgr
-from college.utils.utilities import PROGRESS_TRACKER
+from college.routes.imports import get_import_job_mgr
+from college.services.import_job_services import ImportJobMgr
+from college.utils.versioning import get_expected_version
+from college.utils.pagination import build_filters, get_page_params
+from college.utils.streaming import StreamFormat, streaming_response
+from college.utils.uploads import UPLOAD_OPENAPI, save_upload
 
 
 router = APIRouter()
@@ -33,9 +37,19 @@ async def create_student(student: Student, student_mgr: StudentMgr = Depends(get
 
 
 @router.get("/")
-async def get_students(student_mgr: StudentMgr = Depends(get_student_mgr)):
+async def get_students(program_id: Optional[str] = Query(None),
+                       batch_id: Optional[str] = Query(None),
+                       student_status: Optional[Literal["Active", "Discontinued", "Completed"]] = Query(None, alias="status"),
+                       adm_year: Optional[str] = Query(None),
+                       page: PageParams = Depends(get_page_params),
+                       stream: Optional[StreamFormat] = Query(None),
+                       student_mgr: StudentMgr = Depends(get_student_mgr)):
     try:
-        student_data = await student_mgr.get_all_students()
+        filters = build_filters(program_id=program_id, batch_id=batch_id,
+                                status=student_status, adm_year=adm_year)
+        if stream:
+            return streaming_response(student_mgr.iter_students(filters), stream)
+        student_data = await student_mgr.get_all_students(filters, page)
         return student_data
     except Exception as e:
         raise (e)
@@ -49,52 +63,45 @@ async def get_student_by_user_id(user_id: str, student_mgr: StudentMgr = Depends
     except Exception as e:
         raise (e)
 
+@router.patch("/bulk/")
+async def bulk_update_students(request: StudentBulkUpdate, student_mgr: StudentMgr = Depends(get_student_mgr)):
+    try:
+        result = await student_mgr.bulk_update_students(request)
+        return {"message": "Student Bulk Update Applied", **result}
+    except Exception as e:
+        raise (e)
+
+
 @router.patch("/{student_id}/")
-async def update_student(student_id: str, student: StudentUpdate, student_mgr: StudentMgr = Depends(get_student_mgr)):
+async def update_student(student_id: str, student: StudentUpdate,
+                         expected_version: Optional[int] = Depends(get_expected_version),
+                         student_mgr: StudentMgr = Depends(get_student_mgr)):
     try:
-        result = await student_mgr.update_student_by_id(student_id, student)
-        if result == 0:
+        result = await student_mgr.update_student_by_id(student_id, student, expected_version)
+        if result is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Student not found",
             )
-        return {"message": "Student Updated Successfully"}
+        return {"message": "Student Updated Successfully", "student": result}
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error updating student: {str(e)}"
         )
 
-@router.post("/upload/")
-async def upload_students(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
-    if not file.filename or not file.filename.endswith((".csv", ".xlsx")):
-        raise HTTPException(
-            status_code=400, detail="Only CSV or Excel files are supported"
-        )
-
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    UPLOADS_DIR = os.path.join(BASE_DIR, "..", "uploads")
-    UPLOADS_DIR = os.path.abspath(UPLOADS_DIR)
-
-    os.makedirs(UPLOADS_DIR, exist_ok=True)
-
-    file_id = uuid.uuid4().hex
-    filename = f"{file_id}_{file.filename}"
-    file_path = os.path.join(UPLOADS_DIR, filename)
-
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-
-    PROGRESS_TRACKER[file_id] = {
-        "progress": 0,
-        "status": "processing",
-        "error_file": None,
-        "total": 0,
-        "processed": 0,
-        "successfull": 0,
-        "failed": 0
-    }
-
-    background_tasks.add_task(process_student_csv, file_path, file_id)
-    return {"message": "File is saved for processing"}
\ No newline at end of file
+@router.post("/upload/", openapi_extra=UPLOAD_OPENAPI)
+async def upload_students(request: Request,
+                          dry_run: bool = Query(False),
+                          student_mgr: StudentMgr = Depends(get_student_mgr),
+                          job_mgr: ImportJobMgr = Depends(get_import_job_mgr)):
+    try:
+        upload = await save_upload(request, StudentMgr.IMPORT_COLUMNS)
+        if dry_run:
+            return await student_mgr.validate_student_csv(upload["file_path"])
+        job_id = await job_mgr.enqueue("student", upload)
+        return {"message": "File is saved for processing", "job_id": job_id}
+    except Exception as e:
+        raise (e)
\ No newline at end of file
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from college.db.database import DatabaseConnection, get_db
+from college.models.pagination import PageParams
 from college.models.user import User
 from college.services.user_services import UserMgr
+from college.utils.pagination import build_filters, get_page_params
+from college.utils.streaming import StreamFormat, streaming_response
 
 
 router = APIRouter()
@@ -28,9 +32,16 @@ async def create_user(user: User, user_mgr: UserMgr = Depends(get_user_mgr)):
 
 
 @router.get("/")
-async def get_users(user_mgr: UserMgr = Depends(get_user_mgr)):
+async def get_users(role: Optional[Literal["admin", "faculty", "student"]] = Query(None),
+                    user_status: Optional[Literal["Active", "Inactive"]] = Query(None, alias="status"),
+                    page: PageParams = Depends(get_page_params),
+                    stream: Optional[StreamFormat] = Query(None),
+                    user_mgr: UserMgr = Depends(get_user_mgr)):
     try:
-        user_data = await user_mgr.get_all_users()
+        filters = build_filters(role=role, status=user_status)
+        if stream:
+            return streaming_response(user_mgr.iter_users(filters), stream)
+        user_data = await user_mgr.get_all_users(filters, page)
         return user_data
     except Exception as e:
         raise e
\ No newline at end of file
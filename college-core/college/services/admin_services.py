@@ -0,0 +1,30 @@
+from fastapi import HTTPException, status
+from college.db.database import DatabaseConnection
+from college.db.indexes import index_report, sync_indexes
+from college.core.logging_config import app_logger
+from college.utils.cache import BATCH_CACHE, PROGRAM_CACHE
+
+
+class AdminMgr:
+    def __init__(self, db: DatabaseConnection):
+        self.db = db
+
+    async def get_index_report(self):
+        try:
+            return await index_report(self.db)
+        except Exception as e:
+            app_logger.error(str(e))
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"Error building index report, {str(e)}")
+
+    async def sync_indexes(self, drop_extra: bool = False):
+        try:
+            await sync_indexes(self.db, drop_extra=drop_extra)
+            return await index_report(self.db)
+        except Exception as e:
+            app_logger.error(str(e))
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"Error syncing indexes, {str(e)}")
+
+    def get_cache_stats(self):
+        return [PROGRAM_CACHE.stats(), BATCH_CACHE.stats()]
@@ -1,17 +1,29 @@
 from datetime import datetime
+from typing import Optional
 from bson import ObjectId
-import pandas as pd
 from fastapi import HTTPException, status
-from pydantic import ValidationError
+from college.core.config import config
+from college.db.bulk import upsert_many_unordered
 from college.db.database import DatabaseConnection
-from college.models.batch import Batch
+from college.db.mutations import build_update, selection_query, update_and_fetch, update_selected
+from college.models.batch import Batch, BatchBulkUpdate
+from college.models.pagination import PageParams
 from college.core.logging_config import app_logger
 from college.services.faculty_services import FacultyMgr
 from college.services.program_services import ProgramMgr
-from college.utils.utilities import PROGRESS_TRACKER
+from college.utils.cache import BATCH_CACHE
+from college.utils.dataloader import clear_request_key, get_request_loader
+from college.utils.concurrency import gather_all
+from college.utils.pagination import find_page, paginate
+from college.utils.streaming import iter_chunks
+from college.services.import_job_services import ImportJobMgr
+from college.services.import_services import accept_all, dry_run_import, run_import
+from college.utils.import_validation import FrameValidator
 
 
 class BatchMgr:
+    IMPORT_COLUMNS = ("batch_name", "program_name", "faculty_name")
+
     def __init__(self, db: DatabaseConnection):
         self.db = db
         self.batch_collection = self.db.get_collection_reference("batches")
@@ -36,37 +48,101 @@ class BatchMgr:
             batch_data["created_at"] = datetime.now()
             batch_data["updated_at"] = datetime.now()
             result = await self.batch_collection.insert_one(batch_data)
+            self._invalidate(str(result.inserted_id))
             return result.inserted_id
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error creating batch. {str(e)}")
 
-    async def get_all_batches(self):
+    async def get_all_batches(self, filters: Optional[dict] = None, page: Optional[PageParams] = None):
         try:
-            batches = await self.batch_collection.find().to_list(length=None)
+            batches = await find_page(self.batch_collection, filters, page).to_list(length=None)
             for batch in batches:
                 batch["_id"] = str(batch["_id"])
-                faculty = None
-                if batch.get("faculty_in_charge") is not None:
-                    faculty = await self.faculty_mgr.get_faculty_by_user_id(batch["faculty_in_charge"])
-                batch["faculty"] = faculty
-                program = None
-                if batch.get("program_id") is not None:
-                    program = await self.program_mgr.get_program_by_id(batch["program_id"])
-                batch["program"] = program
-            return batches
+            await self._attach_relations(batches)
+            return paginate(batches, page)
+        except HTTPException as e:
+            raise e
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail=f"Database error occurred while retrieving batch data. {str(e)}")
 
+    async def iter_batches(self, filters: Optional[dict] = None):
+        """Yield batches chunk by chunk, resolving each chunk's relations in bulk."""
+        cursor = self.batch_collection.find(filters or {}, batch_size=config.STREAM_BATCH_SIZE)
+        async for batches in iter_chunks(cursor, config.STREAM_BATCH_SIZE):
+            for batch in batches:
+                batch["_id"] = str(batch["_id"])
+            await self._attach_relations(batches)
+            for batch in batches:
+                yield batch
+
+    async def _attach_relations(self, batches: list):
+        """Embed faculty in charge and program using one $in query per collection."""
+        faculty_map = await self.faculty_mgr.get_faculties_by_user_ids(
+            (batch.get("faculty_in_charge") for batch in batches), with_programs=False)
+        faculties = list(faculty_map.values())
+        program_map = await self.program_mgr.get_programs_by_ids(
+            [doc.get("program_id") for doc in batches + faculties])
+        for faculty in faculties:
+            faculty["program"] = program_map.get(faculty.get("program_id"))
+        for batch in batches:
+            batch["faculty"] = faculty_map.get(batch.get("faculty_in_charge"))
+            batch["program"] = program_map.get(batch.get("program_id"))
+        return batches
+
+    def _batch_loader(self):
+        return get_request_loader("batches", self._fetch_batches_by_ids)
+
+    def _invalidate(self, batch_id: str):
+        BATCH_CACHE.invalidate(batch_id)
+        clear_request_key("batches", batch_id)
+
+    async def _fetch_batches_by_ids(self, batch_ids) -> dict:
+        """Fetch many batches with one $in query, keyed by their string id."""
+        batch_map = {}
+        object_ids = []
+        for bid in set(batch_ids):
+            if not bid or not ObjectId.is_valid(bid):
+                continue
+            batch = BATCH_CACHE.get(bid)
+            if batch is not None:
+                batch_map[bid] = batch
+            else:
+                object_ids.append(ObjectId(bid))
+        if not object_ids:
+            return batch_map
+        batches = await self.batch_collection.find(
+            {"_id": {"$in": object_ids}}).to_list(length=None)
+        for batch in batches:
+            batch["_id"] = str(batch["_id"])
+            BATCH_CACHE.set(batch["_id"], batch)
+            batch_map[batch["_id"]] = batch
+        return batch_map
+
+    async def get_batches_by_ids(self, batch_ids) -> dict:
+        try:
+            loader = self._batch_loader()
+            if loader is not None:
+                return await loader.load_many(
+                    bid for bid in batch_ids if bid and ObjectId.is_valid(bid))
+            return await self._fetch_batches_by_ids(batch_ids)
+        except Exception as e:
+            app_logger.error(str(e))
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"Error fetching batch information,{str(e)}")
+
     async def get_batch_by_id(self, batch_id: str):
         try:
-            batch = await self.batch_collection.find_one({"_id": ObjectId(batch_id)})
+            loader = self._batch_loader()
+            if loader is not None:
+                batch = await loader.load(batch_id)
+            else:
+                batch = (await self._fetch_batches_by_ids([batch_id])).get(batch_id)
             if not batch:
                 raise HTTPException(status_code=404, detail=f"Batch not found")
-            batch["_id"] = str(batch["_id"])
             return batch
         except HTTPException as e:
             app_logger.error(str(e))
@@ -83,6 +159,7 @@ class BatchMgr:
                 {"_id": batch_object_id},
                 {"$set": {"status": "Deleted"}}
             )
+            self._invalidate(batch_id)
             return result.modified_count
 
         except Exception as e:
@@ -90,96 +167,75 @@ class BatchMgr:
             raise HTTPException(
                 status_code=500, detail=f"Error deleting batch, {str(e)}")
 
-    async def process_batch_csv(self, file_path: str, task_id: str):
+    async def bulk_update_batches(self, request: BatchBulkUpdate) -> dict:
         try:
-            df = pd.read_csv(file_path)
-            total_rows = len(df)
-            PROGRESS_TRACKER[task_id]["total"] = total_rows
-            program_map = {
-                p["program_name"]: p["_id"] for p in await self.program_mgr.get_all_programs()
-            }
-            faculty_map = {}
-            faculties = await self.faculty_mgr.get_all_faculties()
-
-            for f in faculties:
-                name_parts = [f.get("first_name"), f.get(
-                    "middle_name"), f.get("last_name")]
-                full_name = " ".join(filter(None, name_parts)).strip()
-
-                faculty_map[full_name] = f["user_id"]
-
-            errors = []
-
-            for i, (_, row) in enumerate(df.iterrows()):
-                raw = row.to_dict()
-
-                pname = raw.get("program_name")
-                if not pname or pname not in program_map:
-                    errors.append({**raw, "error": "Program name not found"})
-                    continue
-                raw["program_id"] = program_map[pname]
-                raw.pop("program_name")
-
-                fname = raw.get("faculty_name")
-                if not fname or fname not in faculty_map:
-                    errors.append({**raw, "error": "Faculty name not found"})
-                    continue
-
-                try:
-                    batch = Batch(**raw)
-                    await self.create_batch_in_db(batch)
-                    PROGRESS_TRACKER[task_id]["successfull"] += 1
-                except ValidationError as ve:
-                    err_msg = "; ".join(
-                        [f"{e['loc'][0]}: {e['msg']}" for e in ve.errors()])
-                    errors.append({**raw, "error": err_msg})
-                except Exception as db_ex:
-                    errors.append({**raw, "error": str(db_ex)})
-
-                PROGRESS_TRACKER[task_id]["processed"] = i + 1
-                PROGRESS_TRACKER[task_id]["progress"] = int(
-                    ((i + 1) / total_rows) * 100)
-
-            if errors:
-                error_path = file_path.replace(".csv", "_errors.csv")
-                pd.DataFrame(errors).to_csv(error_path, index=False)
-                PROGRESS_TRACKER[task_id]["error_file"] = error_path
-                PROGRESS_TRACKER[task_id]["failed"] = len(errors)
-
-            PROGRESS_TRACKER[task_id]["status"] = "completed"
-            app_logger.info(PROGRESS_TRACKER[task_id])
-
+            filters = request.filters.model_dump(exclude_none=True) if request.filters else None
+            query = selection_query(request.ids, filters)
+            result = await update_selected(self.batch_collection, query,
+                                           request.changes.model_dump(exclude_unset=True), request.increment)
+            if request.ids is None:
+                BATCH_CACHE.clear()
+            else:
+                for batch_id in request.ids:
+                    self._invalidate(batch_id)
+            return result
+        except HTTPException as e:
+            raise e
         except Exception as e:
-            PROGRESS_TRACKER[task_id]["status"] = f"failed: {str(e)}"
-
-    async def update_batch_in_db(self, batch_id: str, batch: Batch):
-        try:
-            batch_object_id = ObjectId(batch_id)
-
-            raw_data = batch.model_dump()
-
-            set_data = {}
-            unset_data = {}
+            app_logger.error(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
 
-            for key, value in raw_data.items():
-                if value == "" or value is None:
-                    unset_data[key] = ""
-                else:
-                    set_data[key] = value
+    async def bulk_add_batches(self, batches: list, keys: list) -> dict:
+        batch_docs = []
+        for batch in batches:
+            batch_data = batch.model_dump(exclude_none=True)
+            batch_data["created_at"] = datetime.now()
+            batch_data["updated_at"] = datetime.now()
+            batch_docs.append(batch_data)
+        return await upsert_many_unordered(self.batch_collection, batch_docs, keys)
+
+    async def _import_validator(self) -> FrameValidator:
+        programs, faculties = await gather_all(
+            self.program_mgr.get_all_programs(), self.faculty_mgr.get_all_faculties())
+        program_map = {p["program_name"]: p["_id"] for p in programs}
+        faculty_map = {}
+
+        for f in faculties:
+            name_parts = [f.get("first_name"), f.get(
+                "middle_name"), f.get("last_name")]
+            full_name = " ".join(filter(None, name_parts)).strip()
+
+            faculty_map[full_name] = f["user_id"]
+
+        return FrameValidator(
+            required=("batch_name",),
+            integers=("semester",),
+            choices={"status": ("Active", "Inactive", "Deleted")},
+            references={
+                "program_name": ("program_id", program_map, "Program name not found"),
+                "faculty_name": ("faculty_in_charge", faculty_map, "Faculty name not found"),
+            },
+            required_references=("program_name", "faculty_name"),
+        )
 
-            set_data["updated_at"] = datetime.now()
+    async def process_batch_csv(self, file_path: str, task_id: str):
+        await run_import(file_path, task_id, Batch, self.bulk_add_batches, ImportJobMgr(self.db),
+                         load_validator=self._import_validator)
 
-            update_query = {}
-            if set_data:
-                update_query["$set"] = set_data
-            if unset_data:
-                update_query["$unset"] = unset_data
-            result = await self.batch_collection.update_one(
-                {"_id": batch_object_id},
-                update_query
-            )
+    async def validate_batch_csv(self, file_path: str) -> dict:
+        """Dry run of process_batch_csv."""
+        return await dry_run_import(file_path, Batch, accept_all, load_validator=self._import_validator)
 
-            return result.modified_count
+    async def update_batch_in_db(self, batch_id: str, batch: Batch,
+                                 expected_version: Optional[int] = None):
+        try:
+            updated_batch = await update_and_fetch(
+                self.batch_collection, batch_id, build_update(batch.model_dump()), expected_version)
+            self._invalidate(batch_id)
+            return updated_batch
+        except HTTPException as e:
+            raise e
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(
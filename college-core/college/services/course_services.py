@@ -1,19 +1,33 @@
 from datetime import datetime
+from typing import Optional
 from bson import ObjectId
 from fastapi import HTTPException, status
-import pandas as pd
-from pydantic import ValidationError
+from pymongo.errors import DuplicateKeyError
+from college.core.config import config
+from college.db.bulk import upsert_many_unordered
 from college.db.database import DatabaseConnection
-from college.models.course import Course
+from college.db.transactions import run_in_transaction
+from college.db.mutations import build_update, find_at_version, selection_query, update_and_fetch, update_selected
+from college.db.pipelines import lookup_by_id, stringify_id
+from college.models.course import Course, CourseBulkUpdate
+from college.models.pagination import PageParams
 from college.models.mappings import CourseAssignment
 from college.services.faculty_services import FacultyMgr
 from college.services.mapping_services import MappingMgr
 from college.services.program_services import ProgramMgr
 from college.core.logging_config import app_logger
-from college.utils.utilities import PROGRESS_TRACKER
+from college.utils.concurrency import gather_all
+from college.utils.pagination import find_page, paginate
+from college.utils.streaming import iter_chunks
+from college.services.import_job_services import ImportJobMgr
+from college.services.import_services import dry_run_import, duplicate_checker, run_import
+from college.utils.import_validation import FrameValidator
 
 
 class CourseMgr:
+    IMPORT_COLUMNS = ("course_code", "course_name", "semester", "program_name")
+    IMPORT_DTYPE = {"course_code": str}
+
     def __init__(self, db: DatabaseConnection):
         self.db = db
         self.course_collection = self.db.get_collection_reference("courses")
@@ -39,26 +53,17 @@ class CourseMgr:
             self._mapping_mgr = MappingMgr(self.db)
         return self._mapping_mgr
     
-    async def check_course_code_exists(self, course_code: str):
-        try:
-            course = await self.course_collection.find_one({'course_code': course_code})
-            return course
-        except Exception as e:
-            app_logger.error(str(e))
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail=f"Error checking course code. {str(e)}")
-
     async def add_course_to_db(self, course: Course):
         try:
             course_data = course.model_dump(exclude_none=True)
-            existing_course = await self.check_course_code_exists(course_data['course_code'])
-            if existing_course:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT, detail=f"Course code already exists")
             course_data["created_at"] = datetime.now()
             course_data["updated_at"] = datetime.now()
             result = await self.course_collection.insert_one(course_data)
             return result
+        except DuplicateKeyError:
+            app_logger.error(f'Course code already exists {course.course_code}')
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail=f"Course code already exists")
         except HTTPException as e:
             app_logger.error(str(e))
             raise e
@@ -67,21 +72,32 @@ class CourseMgr:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error adding course. {str(e)} ")
 
-    async def get_all_courses(self):
+    async def get_all_courses(self, filters: Optional[dict] = None, page: Optional[PageParams] = None):
         try:
-            courses = await self.course_collection.find().to_list(length=None)
+            courses = await find_page(self.course_collection, filters, page).to_list(length=None)
             for course in courses:
                 course["_id"] = str(course["_id"])
-                if course.get("program_id"):
-                    program = None
-                    program = await self.program_mgr.get_program_by_id(course.get("program_id"))
-                    course["program"] = program
-            return courses
+            await self.program_mgr.attach_programs(
+                [course for course in courses if course.get("program_id")])
+            return paginate(courses, page)
+        except HTTPException as e:
+            raise e
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(status_code=status.WS_1011_INTERNAL_ERROR,
                                 detail=f"Error retrieving course data{str(e)}")
 
+    async def iter_courses(self, filters: Optional[dict] = None):
+        """Yield courses chunk by chunk, resolving each chunk's programs with one query."""
+        cursor = self.course_collection.find(filters or {}, batch_size=config.STREAM_BATCH_SIZE)
+        async for courses in iter_chunks(cursor, config.STREAM_BATCH_SIZE):
+            for course in courses:
+                course["_id"] = str(course["_id"])
+            await self.program_mgr.attach_programs(
+                [course for course in courses if course.get("program_id")])
+            for course in courses:
+                yield course
+
     async def delete_course_in_db(self, course_id: str):
         try:
             course_object_id = ObjectId(course_id)
@@ -98,135 +114,217 @@ class CourseMgr:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error deleting course. {str(e)} ")
 
-    async def update_course_in_db(self, course_id: str, course: Course):
+    async def update_course_in_db(self, course_id: str, course: Course,
+                                  expected_version: Optional[int] = None):
         try:
-            course_object_id = ObjectId(course_id)
-
-            raw_data = course.model_dump()
-
-            set_data = {}
-            unset_data = {}
-
-            for key, value in raw_data.items():
-                if value == "" or value is None:
-                    unset_data[key] = ""
-                else:
-                    set_data[key] = value
-
-            set_data["updated_at"] = datetime.now()
-
-            update_query = {}
-            if set_data:
-                update_query["$set"] = set_data
-            if unset_data:
-                update_query["$unset"] = unset_data
-
-            result = await self.course_collection.update_one(
-                {"_id": course_object_id},
-                update_query
-            )
-
-            return result.modified_count
+            return await update_and_fetch(
+                self.course_collection, course_id, build_update(course.model_dump()), expected_version)
+        except HTTPException as e:
+            raise e
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(
                 status_code=400, detail=f"Error updating course info, {str(e)}")
 
+    def _course_detail_pipeline(self, course_object_id: ObjectId) -> list:
+        """Course with its program, assignments and each assigned faculty's program."""
+        faculty_pipeline = [
+            *lookup_by_id("programs", "program_id", "program"),
+            stringify_id(),
+        ]
+        assignment_pipeline = [
+            {"$lookup": {
+                "from": "faculties",
+                "localField": "faculty_id",
+                "foreignField": "user_id",
+                "pipeline": faculty_pipeline,
+                "as": "faculty",
+            }},
+            {"$set": {"faculty": {"$first": "$faculty"}}},
+            stringify_id(),
+        ]
+        return [
+            {"$match": {"_id": course_object_id}},
+            *lookup_by_id("programs", "program_id", "program"),
+            {"$set": {"_course_id": {"$toString": "$_id"}}},
+            {"$lookup": {
+                "from": "course_assignment",
+                "localField": "_course_id",
+                "foreignField": "course_id",
+                "pipeline": assignment_pipeline,
+                "as": "assignments",
+            }},
+            {"$set": {"assignments": {"$cond": [
+                {"$gt": [{"$size": "$assignments"}, 0]}, "$assignments", "$$REMOVE"]}}},
+            {"$unset": "_course_id"},
+            stringify_id(),
+        ]
+
     async def get_course_by_id(self, course_id: str):
         try:
             course_object_id = ObjectId(course_id)
-            course = await self.course_collection.find_one({"_id": course_object_id})
-            if course is None:
+            cursor = await self.course_collection.aggregate(
+                self._course_detail_pipeline(course_object_id))
+            courses = await cursor.to_list(length=1)
+            if not courses:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-            course["_id"] = str(course["_id"])
-            if course.get("program_id") not in (None, ""):
-                program = None
-                program = await self.program_mgr.get_program_by_id(course["program_id"])
-                course["program"] = program
-            assignments = await self.mapping_mgr.get_course_assignments(course_id)
-            if assignments is not None:
-                course["assignments"] = assignments
-            return course
+            return courses[0]
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error in getting course, {str(e)} ")
 
-    async def assign_course(self, course_id, assignment_data: CourseAssignment):
+    async def assign_course(self, course_id, assignment_data: CourseAssignment,
+                            expected_version: Optional[int] = None):
         try:
-            course_object_id = ObjectId(course_id)
-            course = await self.course_collection.find_one({"_id": course_object_id})
+            # Assigning does not edit the course, so its version is only checked
+            course = await find_at_version(
+                self.course_collection, course_id, expected_version, projection={"_id": 1})
             if course is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
 
-            # Add to active assignment
-            result = await self.mapping_mgr.add_course_assignment(assignment_data)
-            if not result:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to insert course assignment into the database",)
+            # No "Assigned" history entry without its active assignment
+            async def write_assignment(session):
+                return await self.mapping_mgr.add_course_assignments([assignment_data], session=session)
 
-            # Save to assignment history
-            dict_data = assignment_data.model_dump(exclude_none=True)
-            dict_data["status"] = "Assigned"
-            dict_data["assigned_date"] = datetime.now()
-            result = await self.mapping_mgr.save_course_assignment(dict_data)
-            if not result:
+            assignment_ids = await run_in_transaction(self.db, write_assignment)
+            if not assignment_ids:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to save in assignment history",)
-            return result
+                    detail=f"Failed to insert course assignment into the database",)
+            return assignment_ids[0]
+        except HTTPException as e:
+            raise e
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error Assigning Course. {str(e)}")
     
-    async def process_course_csv(self, file_path: str, task_id: str):
+    async def bulk_update_courses(self, request: CourseBulkUpdate) -> dict:
         try:
-            df = pd.read_csv(file_path)
-            total_rows = len(df)
-            PROGRESS_TRACKER[task_id]["total"] = total_rows
-            program_map = {
-                p["program_name"]: p["_id"] for p in await self.program_mgr.get_all_programs()
-            }
-
-            errors = []
-
-            for i, (_, row) in enumerate(df.iterrows()):
-                raw = row.to_dict()
-
-                pname = raw.get("program_name")
-                if not pname or pname not in program_map:
-                    errors.append({**raw, "error": "Program name not found"})
-                    continue
-                raw["program_id"] = program_map[pname]
-                raw.pop("program_name")
-
-                try:
-                    course = Course(**raw)
-                    await self.add_course_to_db(course)
-                    PROGRESS_TRACKER[task_id]["successfull"] += 1
-                except ValidationError as ve:
-                    err_msg = "; ".join(
-                        [f"{e['loc'][0]}: {e['msg']}" for e in ve.errors()])
-                    errors.append({**raw, "error": err_msg})
-                except Exception as db_ex:
-                    errors.append({**raw, "error": str(db_ex)})
-
-                PROGRESS_TRACKER[task_id]["processed"] = i + 1
-                PROGRESS_TRACKER[task_id]["progress"] = int(
-                    ((i + 1) / total_rows) * 100)
+            filters = request.filters.model_dump(exclude_none=True) if request.filters else None
+            query = selection_query(request.ids, filters)
+            result = await update_selected(self.course_collection, query,
+                                           request.changes.model_dump(exclude_unset=True), request.increment)
+            return result
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            app_logger.error(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
+
+    async def _assignment_errors(self, assignments: list) -> list:
+        """Per-row problems with a bulk assignment, checked with one $in query per collection."""
+        def object_ids(values):
+            return list({ObjectId(value) for value in values if value and ObjectId.is_valid(value)})
+
+        course_ids = object_ids(a.course_id for a in assignments)
+        batch_ids = object_ids(a.batch_id for a in assignments)
+        courses, faculties, batches = await gather_all(
+            self.course_collection.find({"_id": {"$in": course_ids}}, {"_id": 1}).to_list(length=None),
+            self.faculty_mgr.faculty_collection.find(
+                {"user_id": {"$in": list({a.faculty_id for a in assignments})}},
+                {"user_id": 1, "_id": 0}).to_list(length=None),
+            self.db.get_collection_reference("batches").find(
+                {"_id": {"$in": batch_ids}}, {"_id": 1}).to_list(length=None))
+        known_courses = {str(doc["_id"]) for doc in courses}
+        known_faculties = {doc["user_id"] for doc in faculties}
+        known_batches = {str(doc["_id"]) for doc in batches}
+
+        errors, seen = [], set()
+        for index, assignment in enumerate(assignments):
+            key = (assignment.course_id, assignment.faculty_id, assignment.batch_id)
+            if assignment.course_id not in known_courses:
+                errors.append({"index": index, "error": "Course not found"})
+            elif assignment.faculty_id not in known_faculties:
+                errors.append({"index": index, "error": "Faculty not found"})
+            elif assignment.batch_id and assignment.batch_id not in known_batches:
+                errors.append({"index": index, "error": "Batch not found"})
+            elif key in seen:
+                errors.append({"index": index, "error": "Duplicate assignment"})
+            seen.add(key)
+        return errors
+
+    async def assign_courses(self, assignments: list) -> list:
+        """Assign many courses at once; nothing is written unless every row is valid.
 
+        Active assignments and their history entries are committed in one
+        transaction (or written in sequence on a standalone server). The
+        courses themselves are not edited, so their versions stay as they are.
+        """
+        try:
+            errors = await self._assignment_errors(assignments)
             if errors:
-                error_path = file_path.replace(".csv", "_errors.csv")
-                pd.DataFrame(errors).to_csv(error_path, index=False)
-                PROGRESS_TRACKER[task_id]["error_file"] = error_path
-                PROGRESS_TRACKER[task_id]["failed"] = len(errors)
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=errors)
 
-            PROGRESS_TRACKER[task_id]["status"] = "completed"
-            app_logger.info(PROGRESS_TRACKER[task_id])
+            async def write_assignments(session):
+                return await self.mapping_mgr.add_course_assignments(assignments, session=session)
 
+            return await run_in_transaction(self.db, write_assignments)
+        except HTTPException as e:
+            raise e
         except Exception as e:
-            PROGRESS_TRACKER[task_id]["status"] = f"failed: {str(e)}"
+            app_logger.error(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error Assigning Courses. {str(e)}")
+
+    async def bulk_add_courses(self, courses: list, keys: list) -> dict:
+        failures = {}
+        codes = [course.course_code for course in courses]
+        existing = await self.course_collection.find(
+            {"course_code": {"$in": list(set(codes))}},
+            {"course_code": 1, "import_key": 1, "_id": 0}).to_list(length=None)
+        owners = {doc["course_code"]: doc.get("import_key") for doc in existing}
+        taken = set()
+        pending, course_docs = [], []
+        for position, course in enumerate(courses):
+            # A code already written by this same row in an earlier attempt is not a duplicate
+            if course.course_code in taken or owners.get(course.course_code, keys[position]) != keys[position]:
+                failures[position] = "Course code already exists"
+                continue
+            taken.add(course.course_code)
+            course_data = course.model_dump(exclude_none=True)
+            course_data["created_at"] = datetime.now()
+            course_data["updated_at"] = datetime.now()
+            pending.append(position)
+            course_docs.append(course_data)
+        write_failures = await upsert_many_unordered(
+            self.course_collection, course_docs, [keys[position] for position in pending],
+            "Course code already exists")
+        for index, error in write_failures.items():
+            failures[pending[index]] = error
+        return failures
+
+    async def find_existing_course_codes(self, codes: list) -> set:
+        docs = await self.course_collection.find(
+            {"course_code": {"$in": list(set(codes))}}, {"course_code": 1, "_id": 0}).to_list(length=None)
+        return {doc["course_code"] for doc in docs}
+
+    async def _import_validator(self) -> FrameValidator:
+        program_map = {
+            p["program_name"]: p["_id"] for p in await self.program_mgr.get_all_programs()
+        }
+
+        return FrameValidator(
+            required=("course_code", "course_name", "semester"),
+            integers=("semester",),
+            choices={"status": ("Active", "Inactive", "Deleted")},
+            references={
+                "program_name": ("program_id", program_map, "Program name not found"),
+            },
+            required_references=("program_name",),
+        )
+
+    async def process_course_csv(self, file_path: str, task_id: str):
+        await run_import(file_path, task_id, Course, self.bulk_add_courses, ImportJobMgr(self.db),
+                         load_validator=self._import_validator, dtype=self.IMPORT_DTYPE)
+
+    async def validate_course_csv(self, file_path: str) -> dict:
+        """Dry run of process_course_csv, including the duplicate course code check."""
+        check_codes = duplicate_checker(
+            "course_code", self.find_existing_course_codes, "Course code already exists")
+        return await dry_run_import(file_path, Course, check_codes,
+                                    load_validator=self._import_validator, dtype=self.IMPORT_DTYPE)
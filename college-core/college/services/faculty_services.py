@@ -1,18 +1,25 @@
-from datetime import datetime
-from bson import ObjectId
+from typing import Optional
 from fastapi import HTTPException, status
-import pandas as pd
-from pydantic import ValidationError
+from college.core.config import config
 from college.db.database import DatabaseConnection
-from college.models.faculty import Faculty, FacultyUpdate
-from college.models.user import User, UserUpdate
+from college.db.mutations import selection_query, update_selected
+from college.models.faculty import Faculty, FacultyUpdate, FacultyBulkUpdate
+from college.models.pagination import PageParams
 from college.services.program_services import ProgramMgr
 from college.services.user_services import UserMgr
 from college.core.logging_config import app_logger
-from college.utils.utilities import PROGRESS_TRACKER
+from college.utils.dataloader import get_request_loader
+from college.utils.pagination import find_page, paginate
+from college.utils.streaming import iter_chunks
+from college.services.import_job_services import ImportJobMgr
+from college.services.import_services import dry_run_import, run_import
+from college.utils.import_validation import GENDERS, FrameValidator
 
 
 class FacultyMgr:
+    IMPORT_COLUMNS = ("first_name", "email", "phone_no", "program_name")
+    IMPORT_DTYPE = {"phone_no": str}
+
     def __init__(self, db: DatabaseConnection):
         self.db = db
         self.faculty_collection = self.db.get_collection_reference("faculties")
@@ -31,41 +38,9 @@ class FacultyMgr:
             self._user_mgr = UserMgr(self.db)
         return self._user_mgr
     
-    async def check_email_exists(self, email: str):
-        try:
-            existingData = await self.faculty_collection.find_one({'email': email})
-            return existingData
-        except Exception as e:
-            app_logger.error(str(e))
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail=f"An error occurred while checking email. {str(e)}")
-    
     async def add_faculty_to_db(self, faculty: Faculty):
         try:
-            existing_user = await self.check_email_exists(faculty.email)
-            if existing_user:
-                app_logger.error(f'Email already registered {faculty.email}')
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
-            faculty_data = faculty.model_dump(exclude_none=True)
-
-            faculty_user: User = User(
-                first_name=faculty.first_name,
-                middle_name=faculty.middle_name if faculty.middle_name else None,
-                last_name=faculty.last_name if faculty.last_name else None,
-                email=faculty.email,
-                role="faculty",
-                status="Inactive")
-            user_result = await self.user_mgr.add_user_to_db(faculty_user)
-            if not user_result:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to insert user into the database",
-                )
-            faculty_data["user_id"] = str(user_result)
-            faculty_data["created_at"] = datetime.now()
-            faculty_data["updated_at"] = datetime.now()
-            result = await self.faculty_collection.insert_one(faculty_data)
+            result = await self.user_mgr.add_user_with_profile(self.faculty_collection, faculty, "faculty")
             return result.inserted_id
         except HTTPException as e:
             raise e
@@ -74,121 +49,130 @@ class FacultyMgr:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error adding faculty. {str(e)}")
     
-    async def get_all_faculties(self):
+    async def get_all_faculties(self, filters: Optional[dict] = None, page: Optional[PageParams] = None):
         try:
-            faculties = await self.faculty_collection.find().to_list(length=None)
+            faculties = await find_page(self.faculty_collection, filters, page).to_list(length=None)
             for faculty in faculties:
                 faculty["_id"] = str(faculty["_id"])
-                program = None
-                program = await self.program_mgr.get_program_by_id(faculty.get("program_id"))
-                faculty["program"] = program
-            return faculties
+            await self.program_mgr.attach_programs(faculties)
+            return paginate(faculties, page)
+        except HTTPException as e:
+            raise e
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Database error occurred while retrieving faculty data. {str(e)} "
             )
-    
+
+    async def iter_faculties(self, filters: Optional[dict] = None):
+        """Yield faculties batch by batch, resolving each batch's programs with one query."""
+        cursor = self.faculty_collection.find(filters or {}, batch_size=config.STREAM_BATCH_SIZE)
+        async for faculties in iter_chunks(cursor, config.STREAM_BATCH_SIZE):
+            for faculty in faculties:
+                faculty["_id"] = str(faculty["_id"])
+            await self.program_mgr.attach_programs(faculties)
+            for faculty in faculties:
+                yield faculty
+
+    def _faculty_loader(self):
+        return get_request_loader("faculties", self._fetch_faculties_by_user_ids)
+
+    async def get_faculties_by_user_ids(self, user_ids, with_programs: bool = True) -> dict:
+        """Faculties keyed by user_id; within a request, batched through its loader.
+
+        Faculties served by the request loader always carry their program.
+        """
+        loader = self._faculty_loader()
+        if loader is not None:
+            return await loader.load_many(user_ids)
+        return await self._fetch_faculties_by_user_ids(user_ids, with_programs)
+
+    async def _fetch_faculties_by_user_ids(self, user_ids, with_programs: bool = True) -> dict:
+        """Fetch many faculties with one $in query, keyed by user_id."""
+        try:
+            user_ids = [uid for uid in set(user_ids) if uid]
+            if not user_ids:
+                return {}
+            faculties = await self.faculty_collection.find(
+                {"user_id": {"$in": user_ids}}).to_list(length=None)
+            for faculty in faculties:
+                faculty["_id"] = str(faculty["_id"])
+            if with_programs:
+                await self.program_mgr.attach_programs(faculties)
+            return {faculty["user_id"]: faculty for faculty in faculties}
+        except Exception as e:
+            app_logger.error(str(e))
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"An error occurred while retrieving faculty data {str(e)}")
+
     async def get_faculty_by_user_id(self, user_id: str):
         try:
-            faculty = await self.faculty_collection.find_one({"user_id": user_id})
+            loader = self._faculty_loader()
+            if loader is not None:
+                faculty = await loader.load(user_id)
+            else:
+                faculty = (await self._fetch_faculties_by_user_ids([user_id])).get(user_id)
             if not faculty:
                 raise HTTPException(
                     status_code=404, detail=f"Faculty not found")
-            faculty["_id"] = str(faculty["_id"])
-            if faculty.get("program_id"):
-                program = await self.program_mgr.get_program_by_id(faculty.get("program_id"))
-                faculty["program"] = program
             return faculty
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail=f"An error occurred while retrieving faculty data {str(e)}")
     
-    async def process_faculty_csv(self, file_path: str, task_id: str):
+    async def bulk_update_faculties(self, request: FacultyBulkUpdate) -> dict:
         try:
-            df = pd.read_csv(file_path, dtype={"phone_no": str})
-            total_rows = len(df)
-            PROGRESS_TRACKER[task_id]["total"] = total_rows
-            program_map = {
-                p["program_name"]: p["_id"] for p in await self.program_mgr.get_all_programs()
-            }
-            errors = []
-
-            for i, (_, row) in enumerate(df.iterrows()):
-                raw = row.to_dict()
-
-                pname = raw.get("program_name")
-                if not pname or pname not in program_map:
-                    errors.append({**raw, "error": "Program name not found"})
-                    continue
-                raw["program_id"] = program_map[pname]
-                raw.pop("program_name")
-
-                try:
-                    faculty = Faculty(**raw)
-                    await self.add_faculty_to_db(faculty)
-                    PROGRESS_TRACKER[task_id]["successfull"] += 1
-                except ValidationError as ve:
-                    err_msg = "; ".join(
-                        [f"{e['loc'][0]}: {e['msg']}" for e in ve.errors()])
-                    errors.append({**raw, "error": err_msg})
-                except Exception as db_ex:
-                    errors.append({**raw, "error": str(db_ex)})
-
-                PROGRESS_TRACKER[task_id]["processed"] = i + 1
-                PROGRESS_TRACKER[task_id]["progress"] = int(
-                    ((i + 1) / total_rows) * 100)
-
-            if errors:
-                error_path = file_path.replace(".csv", "_errors.csv")
-                pd.DataFrame(errors).to_csv(error_path, index=False)
-                PROGRESS_TRACKER[task_id]["error_file"] = error_path
-                PROGRESS_TRACKER[task_id]["failed"] = len(errors)
-
-            PROGRESS_TRACKER[task_id]["status"] = "completed"
-            app_logger.info(PROGRESS_TRACKER[task_id])
-
+            filters = request.filters.model_dump(exclude_none=True) if request.filters else None
+            query = selection_query(request.ids, filters)
+            result = await update_selected(self.faculty_collection, query,
+                                           request.changes.model_dump(exclude_unset=True))
+            return result
+        except HTTPException as e:
+            raise e
         except Exception as e:
-            PROGRESS_TRACKER[task_id]["status"] = f"failed: {str(e)}"
-    
-    async def update_faculty_by_id(self, faculty_id: str, faculty_data: FacultyUpdate):
-        try:
-            faculty_obj_id = ObjectId(faculty_id)
-
-            raw_data = faculty_data.model_dump()
-
-            set_data = {}
-            unset_data = {}
-
-            for key, value in raw_data.items():
-                if value == "" or value is None:
-                    unset_data[key] = ""
-                else:
-                    set_data[key] = value
+            app_logger.error(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
+
+    async def bulk_add_faculties(self, faculties: list, keys: list) -> dict:
+        return await self.user_mgr.add_users_with_profiles(
+            self.faculty_collection, faculties, "faculty", keys)
+
+    async def _import_validator(self) -> FrameValidator:
+        program_map = {
+            p["program_name"]: p["_id"] for p in await self.program_mgr.get_all_programs()
+        }
+
+        return FrameValidator(
+            required=("first_name", "email", "phone_no"),
+            emails=("email",),
+            phones=("phone_no",),
+            dates=("dob", "join_date", "end_date"),
+            choices={"gender": GENDERS, "status": ("Active", "Resigned")},
+            references={
+                "program_name": ("program_id", program_map, "Program name not found"),
+            },
+            required_references=("program_name",),
+        )
 
-            set_data["updated_at"] = datetime.now()
+    async def process_faculty_csv(self, file_path: str, task_id: str):
+        await run_import(file_path, task_id, Faculty, self.bulk_add_faculties, ImportJobMgr(self.db),
+                         load_validator=self._import_validator, dtype=self.IMPORT_DTYPE)
 
-            update_query = {}
-            if set_data:
-                update_query["$set"] = set_data
-            if unset_data:
-                update_query["$unset"] = unset_data
+    async def validate_faculty_csv(self, file_path: str) -> dict:
+        """Dry run of process_faculty_csv, including the duplicate email check."""
+        return await dry_run_import(file_path, Faculty, self.user_mgr.email_checker(self.faculty_collection),
+                                    load_validator=self._import_validator, dtype=self.IMPORT_DTYPE)
 
-            faculty_user: UserUpdate = UserUpdate(
-                first_name=faculty_data.first_name,
-                middle_name=faculty_data.middle_name,
-                last_name=faculty_data.last_name,
-                email=faculty_data.email,
-            )
-            user_update_result = await self.user_mgr.update_user_in_db(faculty_data.user_id if faculty_data.user_id else "", faculty_user)
-
-            updated_student = await self.faculty_collection.update_one(
-                {"_id": faculty_obj_id},
-                update_query
-            )
-            return updated_student.matched_count
+    async def update_faculty_by_id(self, faculty_id: str, faculty_data: FacultyUpdate,
+                                   expected_version: Optional[int] = None):
+        try:
+            return await self.user_mgr.update_user_with_profile(
+                self.faculty_collection, faculty_id, faculty_data, expected_version)
+        except HTTPException as e:
+            raise e
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,330 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Literal, Optional
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from college.core.config import config
+from college.db.database import DatabaseConnection
+from college.core.logging_config import app_logger
+from college.models.pagination import PageParams
+from college.utils.pagination import find_page, paginate
+from college.utils.utilities import PROGRESS_TRACKER
+
+ImportKind = Literal["program", "batch", "course", "faculty", "student"]
+JobStatus = Literal["queued", "running", "completed", "failed"]
+ERROR_FILE_SUFFIX = "_errors.csv"
+
+
+def new_progress() -> dict:
+    return {
+        "progress": 0,
+        "status": "processing",
+        "error_file": None,
+        "total": 0,
+        "processed": 0,
+        "successfull": 0,
+        "failed": 0
+    }
+
+
+def error_file_url(path: Optional[str]) -> Optional[str]:
+    return f"/imports/errors/{os.path.basename(path)}/" if path else None
+
+
+def error_file_path(file_name: str) -> str:
+    """Resolve an error file name to its path in UPLOADS_DIR; 404 for anything else."""
+    path = os.path.join(os.path.abspath(config.UPLOADS_DIR), os.path.basename(file_name))
+    if (os.path.basename(file_name) != file_name or not file_name.endswith(ERROR_FILE_SUFFIX)
+            or not os.path.isfile(path)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Error file not found")
+    return path
+
+
+class ImportJobMgr:
+    """Durable import jobs stored in the ``import_jobs`` collection.
+
+    A worker claims a job by taking a lease on it (``lease_owner`` and
+    ``lease_expires_at``) and keeps renewing the lease while the import runs.
+    A job whose lease runs out, because its worker crashed or was redeployed,
+    can be claimed again by any worker until IMPORT_JOB_MAX_ATTEMPTS is
+    reached.
+    """
+
+    def __init__(self, db: DatabaseConnection):
+        self.db = db
+        self.job_collection = self.db.get_collection_reference("import_jobs")
+
+    async def enqueue(self, kind: ImportKind, upload: dict) -> str:
+        """Queue an upload saved by save_upload()."""
+        try:
+            now = datetime.now()
+            result = await self.job_collection.insert_one({
+                "kind": kind,
+                "file_path": upload["file_path"],
+                "file_name": upload["file_name"],
+                "file_hash": upload["file_hash"],
+                "size": upload["size"],
+                "status": "queued",
+                "attempts": 0,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "progress": {**new_progress(), "total": upload["rows"] or 0},
+                "error": None,
+                "created_at": now,
+                "updated_at": now,
+            })
+            return str(result.inserted_id)
+        except Exception as e:
+            app_logger.error(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
+
+    async def claim(self, worker_id: str) -> Optional[dict]:
+        """Lease the oldest runnable job to ``worker_id``, or return None."""
+        now = datetime.now()
+        return await self.job_collection.find_one_and_update(
+            {"$or": [
+                {"status": "queued"},
+                {"status": "running", "lease_expires_at": {"$lt": now},
+                 "attempts": {"$lt": config.IMPORT_JOB_MAX_ATTEMPTS}},
+            ]},
+            {"$set": {
+                "status": "running",
+                "lease_owner": worker_id,
+                "lease_expires_at": now + timedelta(seconds=config.IMPORT_JOB_LEASE_SECONDS),
+                "started_at": now,
+                "updated_at": now,
+            }, "$inc": {"attempts": 1}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def heartbeat(self, job_id: str, worker_id: str, progress: dict) -> bool:
+        """Renew the lease and publish progress; False once the lease is lost."""
+        now = datetime.now()
+        result = await self.job_collection.update_one(
+            {"_id": ObjectId(job_id), "lease_owner": worker_id, "status": "running"},
+            {"$set": {
+                "lease_expires_at": now + timedelta(seconds=config.IMPORT_JOB_LEASE_SECONDS),
+                "progress": progress,
+                "updated_at": now,
+            }},
+        )
+        return result.matched_count == 1
+
+    async def save_checkpoint(self, job_id: str, checkpoint: dict):
+        """Record how far an import got once a chunk's writes are committed."""
+        if not ObjectId.is_valid(job_id):
+            return
+        await self.job_collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {"checkpoint": checkpoint, "updated_at": datetime.now()}},
+        )
+
+    async def get_resume_state(self, job_id: str) -> dict:
+        """The upload hash recorded at enqueue time and the last checkpoint, if any."""
+        if not ObjectId.is_valid(job_id):
+            return {}
+        job = await self.job_collection.find_one(
+            {"_id": ObjectId(job_id)}, {"file_hash": 1, "checkpoint": 1, "_id": 0})
+        return job or {}
+
+    async def finish(self, job_id: str, worker_id: str, progress: dict):
+        failed = progress["status"].startswith("failed")
+        now = datetime.now()
+        await self.job_collection.update_one(
+            {"_id": ObjectId(job_id), "lease_owner": worker_id},
+            {"$set": {
+                "status": "failed" if failed else "completed",
+                "error": progress["status"] if failed else None,
+                "progress": progress,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "finished_at": now,
+                "updated_at": now,
+            }},
+        )
+
+    async def release(self, job_id: str, worker_id: str, progress: dict):
+        """Hand a job back to the queue, e.g. when its worker shuts down.
+
+        A job already on its last allowed attempt is failed instead, as
+        fail_abandoned() does for expired leases.
+        """
+        now = datetime.now()
+        exhausted = {"$gte": ["$attempts", config.IMPORT_JOB_MAX_ATTEMPTS]}
+        # A pipeline update, so the attempts check and the write are one atomic step
+        await self.job_collection.update_one(
+            {"_id": ObjectId(job_id), "lease_owner": worker_id},
+            [{"$set": {
+                "status": {"$cond": [exhausted, "failed", "queued"]},
+                "error": {"$cond": [exhausted, "Import released after its last allowed attempt", None]},
+                "finished_at": {"$cond": [exhausted, now, "$$REMOVE"]},
+                "progress": {"$literal": progress},
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "updated_at": now,
+            }}],
+        )
+
+    async def fail_abandoned(self) -> int:
+        """Fail jobs whose lease expired after their last allowed attempt."""
+        now = datetime.now()
+        result = await self.job_collection.update_many(
+            {"status": "running", "lease_expires_at": {"$lt": now},
+             "attempts": {"$gte": config.IMPORT_JOB_MAX_ATTEMPTS}},
+            {"$set": {
+                "status": "failed",
+                "error": "Import worker stopped responding",
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "finished_at": now,
+                "updated_at": now,
+            }},
+        )
+        return result.modified_count
+
+    async def get_job(self, job_id: str):
+        try:
+            if not ObjectId.is_valid(job_id):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+            job = await self.job_collection.find_one({"_id": ObjectId(job_id)})
+            if not job:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+            job["_id"] = str(job["_id"])
+            return job
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            app_logger.error(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
+
+    async def get_all_jobs(self, filters: Optional[dict] = None, page: Optional[PageParams] = None):
+        try:
+            jobs = await find_page(self.job_collection, filters, page).to_list(length=None)
+            for job in jobs:
+                job["_id"] = str(job["_id"])
+            return paginate(jobs, page)
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            app_logger.error(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
+
+
+PROGRESS_FIELDS = ("progress", "total", "processed", "successfull", "failed", "error_file")
+FINISHED_STATUSES = ("completed", "failed")
+# Sent once, and ends the stream, when the job document is gone
+MISSING_SNAPSHOT = {"status": "not_found", "error": "Import job not found"}
+END_STATUSES = (*FINISHED_STATUSES, MISSING_SNAPSHOT["status"])
+KEEP_ALIVE_SECONDS = 15
+
+
+class _Subscriber:
+    def __init__(self):
+        self.latest = None
+        self.changed = asyncio.Event()
+
+    def publish(self, snapshot: dict):
+        # Only the newest snapshot is kept, so slow clients skip intermediate updates
+        self.latest = snapshot
+        self.changed.set()
+
+
+class ImportProgressBroker:
+    """Fans import progress out to every client watching a job.
+
+    Each job watched in this process gets one feed that samples the job at
+    most once every IMPORT_EVENTS_INTERVAL_SECONDS, however many clients are
+    subscribed. Jobs running in this process are read from PROGRESS_TRACKER,
+    others from their job document.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, set] = {}
+        self._feeds: dict[str, asyncio.Task] = {}
+        self._latest: dict[str, dict] = {}
+
+    async def subscribe(self, job_mgr: ImportJobMgr, job_id: str) -> AsyncIterator[Optional[tuple]]:
+        """Yield ``("progress", changed fields)`` until the job finishes, then ``("end", ...)``.
+
+        The first event carries the full snapshot, replayed from the job's
+        feed when other clients are already watching. None is yielded when
+        nothing changed for KEEP_ALIVE_SECONDS.
+        """
+        subscriber = _Subscriber()
+        self._subscribers.setdefault(job_id, set()).add(subscriber)
+        cached = self._latest.get(job_id)
+        if cached is not None:
+            subscriber.publish(cached)
+        if job_id not in self._feeds:
+            self._feeds[job_id] = asyncio.create_task(self._feed(job_mgr, job_id))
+        sent = {}
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(subscriber.changed.wait(), timeout=KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                subscriber.changed.clear()
+                snapshot = subscriber.latest
+                delta = {key: value for key, value in snapshot.items() if sent.get(key, object()) != value}
+                sent = snapshot
+                if delta:
+                    yield "progress", delta
+                if snapshot["status"] in END_STATUSES:
+                    yield "end", snapshot
+                    return
+        finally:
+            self._unsubscribe(job_id, subscriber)
+
+    def _unsubscribe(self, job_id: str, subscriber: _Subscriber):
+        subscribers = self._subscribers.get(job_id, set())
+        subscribers.discard(subscriber)
+        if not subscribers:
+            self._subscribers.pop(job_id, None)
+            feed = self._feeds.pop(job_id, None)
+            self._latest.pop(job_id, None)
+            if feed is not None:
+                feed.cancel()
+
+    async def _feed(self, job_mgr: ImportJobMgr, job_id: str):
+        last = None
+        while self._subscribers.get(job_id):
+            try:
+                snapshot = await self._snapshot(job_mgr, job_id) or MISSING_SNAPSHOT
+            except Exception as e:
+                app_logger.error(f'Import progress for {job_id} unavailable: {str(e)}')
+                snapshot = None
+            if snapshot is not None and snapshot != last:
+                last = snapshot
+                self._latest[job_id] = snapshot
+                for subscriber in list(self._subscribers.get(job_id, ())):
+                    subscriber.publish(snapshot)
+                if snapshot["status"] in END_STATUSES:
+                    break
+            await asyncio.sleep(config.IMPORT_EVENTS_INTERVAL_SECONDS)
+        self._feeds.pop(job_id, None)
+        self._latest.pop(job_id, None)
+
+    async def _snapshot(self, job_mgr: ImportJobMgr, job_id: str) -> Optional[dict]:
+        progress = PROGRESS_TRACKER.get(job_id)
+        if progress is not None:
+            return {"status": "running", **{key: progress.get(key) for key in PROGRESS_FIELDS}}
+        job = await job_mgr.job_collection.find_one(
+            {"_id": ObjectId(job_id)}, {"status": 1, "error": 1, "progress": 1})
+        if job is None:
+            return None
+        progress = job.get("progress") or {}
+        return {"status": job["status"], "error": job.get("error"),
+                **{key: progress.get(key) for key in PROGRESS_FIELDS}}
+
+
+PROGRESS_BROKER = ImportProgressBroker()
@@ -0,0 +1,309 @@
+import asyncio
+import csv
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Optional
+import pandas as pd
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from college.core.config import config
+from college.core.logging_config import app_logger
+from college.utils.import_validation import FrameValidator, row_errors, to_records
+from college.services.import_job_services import (ERROR_FILE_SUFFIX, ImportJobMgr, error_file_url,
+                                                   new_progress)
+from college.utils.readers import count_rows, file_digest, read_chunks
+from college.utils.utilities import PROGRESS_TRACKER
+
+
+class RowError(Exception):
+    """Raised by a row preparer when a row cannot be imported."""
+
+
+def format_validation_error(ve: ValidationError) -> str:
+    return "; ".join([f"{e['loc'][0]}: {e['msg']}" for e in ve.errors()])
+
+
+_import_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_import_pool(rows: int = 0) -> Optional[ProcessPoolExecutor]:
+    """Shared pool for CPU-bound work on an import of ``rows`` rows, or None to run it inline."""
+    global _import_pool
+    if config.IMPORT_EXECUTOR != "process" or rows < config.IMPORT_PROCESS_MIN_ROWS:
+        return None
+    if _import_pool is None:
+        # spawn: forking a process that runs an event loop and driver threads is unsafe
+        _import_pool = ProcessPoolExecutor(
+            max_workers=config.IMPORT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"))
+    return _import_pool
+
+
+def shutdown_import_pool():
+    global _import_pool
+    if _import_pool is not None:
+        _import_pool.shutdown(wait=False, cancel_futures=True)
+        _import_pool = None
+
+
+def import_key(file_hash: str, position: int) -> str:
+    """Deterministic key of a data row: the upload's content hash and row number."""
+    return f"{file_hash[:16]}:{position + 1}"
+
+
+def prepare_chunk(chunk: pd.DataFrame, validator: Optional[FrameValidator], model) -> tuple:
+    """Validate one chunk and build models for the rows that pass.
+
+    Pure CPU work with picklable inputs and outputs so it can run in a pool
+    worker. Returns ``(errors, rows, models, positions)`` where ``rows[i]``
+    is the original upload row behind ``models[i]`` and ``positions[i]`` its
+    row position in the file.
+    """
+    errors = []
+    if validator is not None:
+        failed = row_errors(validator.validate(chunk))
+        invalid = failed.notna()
+        if invalid.any():
+            errors.extend(to_records(chunk[invalid].assign(error=failed[invalid])))
+        chunk = chunk[~invalid]
+        originals = to_records(chunk)
+        records = to_records(validator.resolve(chunk))
+    else:
+        originals = records = to_records(chunk)
+
+    rows, models, positions = [], [], []
+    for position, original, raw in zip(chunk.index.tolist(), originals, records):
+        try:
+            # Empty cells fall back to the model defaults
+            models.append(model(**{key: value for key, value in raw.items() if value is not None}))
+            rows.append(original)
+            positions.append(position)
+        except RowError as row_error:
+            errors.append({**original, "error": str(row_error)})
+        except ValidationError as ve:
+            errors.append({**original, "error": format_validation_error(ve)})
+    return errors, rows, models, positions
+
+
+class ErrorFileWriter:
+    """Appends rejected rows to ``<upload>_errors.csv`` as they are found."""
+
+    def __init__(self, file_path: str):
+        root, _ = os.path.splitext(file_path)
+        self.path = f"{root}{ERROR_FILE_SUFFIX}"
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    @property
+    def size(self) -> int:
+        return self._file.tell() if self._file is not None else 0
+
+    def resume(self, columns: list, size: int, count: int):
+        """Reopen a previous run's file, dropping anything written after ``size``."""
+        if not size or not os.path.exists(self.path):
+            return
+        self._file = open(self.path, "r+", newline="", encoding="utf-8")
+        self._file.truncate(size)
+        self._file.seek(size)
+        self._writer = csv.DictWriter(
+            self._file, fieldnames=[*columns, "error"], extrasaction="ignore")
+        self.count = count
+
+    def write(self, columns: list, rows: list):
+        if not rows:
+            return
+        if self._writer is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(
+                self._file, fieldnames=[*columns, "error"], extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._file.flush()
+        self.count += len(rows)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ImportEngine:
+    """Imports an uploaded CSV or Excel file chunk by chunk with bulk writes."""
+
+    def __init__(self, file_path: str, task_id: str, dtype: Optional[dict] = None,
+                 validator: Optional[FrameValidator] = None, chunk_size: int = 0,
+                 job_mgr: Optional[ImportJobMgr] = None, progress: Optional[dict] = None):
+        self.file_path = file_path
+        self.task_id = task_id
+        self.dtype = dtype
+        self.validator = validator
+        self.chunk_size = chunk_size or config.IMPORT_CHUNK_SIZE
+        self.job_mgr = job_mgr
+        self.progress = PROGRESS_TRACKER[task_id] if progress is None else progress
+        self.error_file = ErrorFileWriter(file_path)
+
+    async def run(self, model: Callable[..., object],
+                  write_chunk: Callable[[list, list], Awaitable[dict]]):
+        try:
+            total_rows = await asyncio.to_thread(count_rows, self.file_path)
+            self.progress["total"] = total_rows
+            state = await self.job_mgr.get_resume_state(self.task_id) if self.job_mgr else {}
+            file_hash = state.get("file_hash") or await asyncio.to_thread(file_digest, self.file_path)
+            processed = self._resume(state.get("checkpoint"), file_hash)
+            chunks = self._prepared_chunks(model, processed, total_rows)
+            async for size, columns, (errors, rows, models, positions) in chunks:
+                keys = [import_key(file_hash, position) for position in positions]
+                errors += await self._write_chunk(rows, models, keys, write_chunk)
+                self.error_file.write(columns, errors)
+                processed += size
+                self._report(processed, total_rows)
+                await self._checkpoint(file_hash, processed, columns)
+
+            self.progress["total"] = processed
+            self.progress["progress"] = 100
+            if self.error_file.count:
+                self.progress["error_file"] = self.error_file.path
+                self.progress["failed"] = self.error_file.count
+
+            self.progress["status"] = "completed"
+            app_logger.info(self.progress)
+
+        except Exception as e:
+            app_logger.error(str(e))
+            self.progress["status"] = f"failed: {str(e)}"
+        finally:
+            self.error_file.close()
+
+    def _report(self, processed: int, total_rows: int):
+        self.progress["processed"] = processed
+        self.progress["failed"] = self.error_file.count
+        # Workbooks without recorded dimensions have no row count up front
+        self.progress["progress"] = min(int((processed / total_rows) * 100), 100) if total_rows else 0
+
+    def _resume(self, checkpoint: Optional[dict], file_hash: str) -> int:
+        """Restore state from the job's checkpoint and return the rows already done."""
+        if not checkpoint or checkpoint.get("file_hash") != file_hash:
+            return 0
+        self.error_file.resume(checkpoint["columns"], checkpoint["error_file_size"], checkpoint["failed"])
+        self.progress["successfull"] = checkpoint["successfull"]
+        app_logger.info(f'Import {self.task_id} resuming after row {checkpoint["rows"]}')
+        return checkpoint["rows"]
+
+    async def _checkpoint(self, file_hash: str, processed: int, columns: list):
+        if self.job_mgr is None:
+            return
+        await self.job_mgr.save_checkpoint(self.task_id, {
+            "file_hash": file_hash,
+            "rows": processed,
+            "columns": columns,
+            "successfull": self.progress["successfull"],
+            "failed": self.error_file.count,
+            "error_file_size": self.error_file.size,
+        })
+
+    async def _prepared_chunks(self, model, skip_rows: int = 0, total_rows: int = 0) -> AsyncIterator[tuple]:
+        """Yield ``(row_count, columns, prepare_chunk result)`` in file order."""
+        loop = asyncio.get_running_loop()
+        pool = get_import_pool(total_rows)
+        reader = read_chunks(self.file_path, self.chunk_size, self.dtype, skip_rows)
+        in_flight = deque()
+        try:
+            while True:
+                # Parse off the loop; pandas' C tokenizer also releases the GIL for CSV
+                chunk = await asyncio.to_thread(next, reader, None)
+                if chunk is None:
+                    break
+                if pool is None:
+                    yield len(chunk), list(chunk.columns), prepare_chunk(chunk, self.validator, model)
+                    continue
+                in_flight.append((len(chunk), list(chunk.columns), loop.run_in_executor(
+                    pool, prepare_chunk, chunk, self.validator, model)))
+                if len(in_flight) > config.IMPORT_WORKERS:
+                    size, columns, future = in_flight.popleft()
+                    yield size, columns, await future
+            while in_flight:
+                size, columns, future = in_flight.popleft()
+                yield size, columns, await future
+        finally:
+            reader.close()
+
+    async def _write_chunk(self, rows: list, models: list, keys: list, write_chunk) -> list:
+        errors = []
+        failures = await write_chunk(models, keys) if models else {}
+        for position, original in enumerate(rows):
+            if position in failures:
+                errors.append({**original, "error": failures[position]})
+            else:
+                self.progress["successfull"] += 1
+        return errors
+
+
+async def accept_all(models: list, keys: list) -> dict:
+    """Dry-run writer for imports without unique fields."""
+    return {}
+
+
+def duplicate_checker(field: str, find_existing: Callable[[list], Awaitable[set]], message: str):
+    """Dry-run writer rejecting rows whose ``field`` is already stored or repeats an earlier row.
+
+    ``find_existing`` returns the values among a chunk's that are already in
+    the database; values seen earlier in the file are tracked across chunks.
+    """
+    seen = set()
+
+    async def check(models: list, keys: list) -> dict:
+        values = [getattr(model, field) for model in models]
+        existing = await find_existing(values)
+        failures = {}
+        for position, value in enumerate(values):
+            if value in existing or value in seen:
+                failures[position] = message
+            seen.add(value)
+        return failures
+
+    return check
+
+
+async def run_import(file_path: str, task_id: str, model: Callable[..., object],
+                     write_chunk: Callable[[list, list], Awaitable[dict]], job_mgr: ImportJobMgr,
+                     load_validator: Optional[Callable[[], Awaitable[Optional[FrameValidator]]]] = None,
+                     dtype: Optional[dict] = None):
+    """Run an import job; it is marked failed when ``load_validator`` raises."""
+    try:
+        validator = await load_validator() if load_validator is not None else None
+    except Exception as e:
+        PROGRESS_TRACKER[task_id]["status"] = f"failed: {str(e)}"
+        return
+    engine = ImportEngine(file_path, task_id, dtype=dtype, validator=validator, job_mgr=job_mgr)
+    await engine.run(model, write_chunk)
+
+
+async def dry_run_import(file_path: str, model: Callable[..., object],
+                         check_chunk: Callable[[list, list], Awaitable[dict]],
+                         load_validator: Optional[Callable[[], Awaitable[Optional[FrameValidator]]]] = None,
+                         dtype: Optional[dict] = None) -> dict:
+    """Run an upload through the import pipeline with ``check_chunk`` in place of the writer.
+
+    Nothing is written to the database. The upload itself is removed
+    afterwards, even when ``load_validator`` fails, while rejected rows stay
+    in its error file for download.
+    """
+    report = new_progress()
+    try:
+        validator = await load_validator() if load_validator is not None else None
+        engine = ImportEngine(file_path, "dry-run", dtype=dtype, validator=validator, progress=report)
+        await engine.run(model, check_chunk)
+    finally:
+        os.remove(file_path)
+    if report["status"] != "completed":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Could not validate file: {report['status']}")
+    return {
+        "total": report["total"],
+        "valid": report["successfull"],
+        "invalid": report["failed"],
+        "error_file": error_file_url(report["error_file"]),
+    }
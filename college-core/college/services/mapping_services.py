@@ -5,6 +5,7 @@ from college.db.database import DatabaseConnection
 from college.models.mappings import CourseAssignment
 from college.services.faculty_services import FacultyMgr
 from college.core.logging_config import app_logger
+from college.utils.concurrency import gather_all
 
 
 class MappingMgr:
@@ -41,6 +42,18 @@ class MappingMgr:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error Saving course assignment in history, {str(e)}")
     
+    async def add_course_assignments(self, assignments: list, session=None) -> list:
+        """Insert active assignments and their history entries with one insert_many each."""
+        now = datetime.now()
+        active_docs, history_docs = [], []
+        for assignment in assignments:
+            data = assignment.model_dump(exclude_none=True)
+            active_docs.append({**data, "assigned_date": now})
+            history_docs.append({**data, "status": "Assigned", "assigned_date": now})
+        result = await self.course_assignment.insert_many(active_docs, session=session)
+        await self.course_assignment_history.insert_many(history_docs, session=session)
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+
     async def get_course_assignments(self, course_id: str):
         try:
             assignments = await self.course_assignment.find(
@@ -48,10 +61,12 @@ class MappingMgr:
             if not assignments:
                 return None
 
-            for assignment in assignments:
+            # Issued together so the request's faculty loader fetches them in one query
+            faculties = await gather_all(*(
+                self.faculty_mgr.get_faculty_by_user_id(assignment.get("faculty_id"))
+                for assignment in assignments))
+            for assignment, faculty in zip(assignments, faculties):
                 assignment["_id"] = str(assignment["_id"])
-                faculty = None
-                faculty = await self.faculty_mgr.get_faculty_by_user_id(assignment.get("faculty_id"))
                 if faculty:
                     assignment["faculty"] = faculty
             return assignments
@@ -1,16 +1,29 @@
 from datetime import datetime
-from typing import Literal
+from typing import Literal, Optional
 from bson import ObjectId
 from fastapi import HTTPException, status
-from pydantic import ValidationError
-import pandas as pd
+from college.core.config import config
+from college.db.bulk import upsert_many_unordered
 from college.db.database import DatabaseConnection
+from college.db.mutations import build_update, update_and_fetch
 from college.core.logging_config import app_logger
+from college.models.pagination import PageParams
 from college.models.program import Program
-from college.utils.utilities import PROGRESS_TRACKER
+from college.utils.cache import PROGRAM_CACHE
+from college.utils.dataloader import clear_request_key, get_request_loader
+from college.utils.pagination import find_page, paginate
+from college.services.import_job_services import ImportJobMgr
+from college.services.import_services import accept_all, dry_run_import, run_import
+from college.utils.import_validation import FrameValidator
 
 
 class ProgramMgr:
+    IMPORT_COLUMNS = ("program_name",)
+    IMPORT_VALIDATOR = FrameValidator(
+        required=("program_name",),
+        choices={"status": ("Active", "Inactive", "Deleted")},
+    )
+
     def __init__(self, db: DatabaseConnection):
         self.db = db
         self.program_collection = self.db.get_collection_reference("programs")
@@ -21,65 +34,116 @@ class ProgramMgr:
             program_data["created_at"] = datetime.now()
             program_data["updated_at"] = datetime.now()
             result = await self.program_collection.insert_one(program_data)
+            self._invalidate(str(result.inserted_id))
             return result.inserted_id
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
 
-    async def check_program_exists(self, program_id: str):
+    async def update_program_in_db(self, program_id: str, program: Program,
+                                   expected_version: Optional[int] = None):
         try:
-            program_object_id = ObjectId(program_id)
-            existing_program = await self.program_collection.find_one({"_id": program_object_id})
-            return existing_program
-        except Exception as e:
-            app_logger.error(str(e))
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
-    
-    async def update_program_in_db(self, program_id: str, program: Program):
-        try:
-            existing_program = await self.check_program_exists(program_id)
-            if not existing_program:
+            updated_program = await update_and_fetch(
+                self.program_collection, program_id,
+                build_update(program.model_dump(), unset_empty=False), expected_version)
+            if updated_program is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Program not found")
-
-            program_data = program.model_dump()
-            program_data["updated_at"] = datetime.now()
-            result = await self.program_collection.update_one(
-                {"_id": ObjectId(program_id)},
-                {"$set": program_data}
-            )
-            return result
+            self._invalidate(program_id)
+            return updated_program
+        except HTTPException as e:
+            raise e
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
             
+    def _program_loader(self):
+        return get_request_loader("programs", self._fetch_programs_by_ids)
+
+    def _invalidate(self, program_id: str):
+        PROGRAM_CACHE.invalidate(program_id)
+        clear_request_key("programs", program_id)
+
     async def get_program_by_id(self, program_id: str):
         try:
-            program = await self.program_collection.find_one({"_id": ObjectId(program_id)})
+            loader = self._program_loader()
+            if loader is not None:
+                program = await loader.load(program_id)
+            else:
+                program = (await self._fetch_programs_by_ids([program_id])).get(program_id)
             if program is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail=f"Program not found")
-            program["_id"] = str(program["_id"])
             return program
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
-    
-    async def get_all_programs(self):
+
+    async def get_programs_by_ids(self, program_ids) -> dict:
+        """Programs keyed by string id; within a request, batched through its loader."""
+        loader = self._program_loader()
+        if loader is not None:
+            return await loader.load_many(
+                pid for pid in program_ids if pid and ObjectId.is_valid(pid))
+        return await self._fetch_programs_by_ids(program_ids)
+
+    async def _fetch_programs_by_ids(self, program_ids) -> dict:
+        """Fetch many programs with one $in query, keyed by their string id."""
         try:
-            programs = await self.program_collection.find().to_list(length=None)
+            program_map = {}
+            object_ids = []
+            for pid in set(program_ids):
+                if not pid or not ObjectId.is_valid(pid):
+                    continue
+                program = PROGRAM_CACHE.get(pid)
+                if program is not None:
+                    program_map[pid] = program
+                else:
+                    object_ids.append(ObjectId(pid))
+            if not object_ids:
+                return program_map
+            programs = await self.program_collection.find(
+                {"_id": {"$in": object_ids}}).to_list(length=None)
             for program in programs:
                 program["_id"] = str(program["_id"])
-            return programs
+                PROGRAM_CACHE.set(program["_id"], program)
+                program_map[program["_id"]] = program
+            return program_map
+        except Exception as e:
+            app_logger.error(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
+
+    async def attach_programs(self, documents: list, field: str = "program_id", as_field: str = "program"):
+        """Embed each document's program, resolving all of them with a single query."""
+        program_map = await self.get_programs_by_ids(
+            doc.get(field) for doc in documents)
+        for doc in documents:
+            doc[as_field] = program_map.get(doc.get(field))
+        return documents
+
+    async def get_all_programs(self, filters: Optional[dict] = None, page: Optional[PageParams] = None):
+        try:
+            programs = await find_page(self.program_collection, filters, page).to_list(length=None)
+            for program in programs:
+                program["_id"] = str(program["_id"])
+            return paginate(programs, page)
+        except HTTPException as e:
+            raise e
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
     
+    async def iter_programs(self, filters: Optional[dict] = None):
+        cursor = self.program_collection.find(filters or {}, batch_size=config.STREAM_BATCH_SIZE)
+        async for program in cursor:
+            program["_id"] = str(program["_id"])
+            yield program
+
     async def delete_program_in_db(self, program_id: str):
         try:
             program_object_id = ObjectId(program_id)
@@ -87,49 +151,33 @@ class ProgramMgr:
                 {"_id": program_object_id},
                 {"$set": {"status": "Deleted", "deleted_at": datetime.now()}}
             )
+            self._invalidate(program_id)
             return result.modified_count
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error: " + str(e))
     
-    async def process_program_csv(self, file_path: str, task_id: str):
-        try:
-            df = pd.read_csv(file_path)
-            total_rows = len(df)
-            PROGRESS_TRACKER[task_id]["total"] = total_rows
-            errors = []
-
-            for i, (_, row) in enumerate(df.iterrows()):
-                raw = row.to_dict()
-
-                try:
-                    program = Program(**raw)
-                    await self.add_program_to_db(program)
-                    PROGRESS_TRACKER[task_id]["successfull"] += 1
-                except ValidationError as ve:
-                    err_msg = "; ".join(
-                        [f"{e['loc'][0]}: {e['msg']}" for e in ve.errors()])
-                    errors.append({**raw, "error": err_msg})
-                except Exception as db_ex:
-                    errors.append({**raw, "error": str(db_ex)})
+    async def bulk_add_programs(self, programs: list, keys: list) -> dict:
+        program_docs = []
+        for program in programs:
+            program_data = program.model_dump()
+            program_data["created_at"] = datetime.now()
+            program_data["updated_at"] = datetime.now()
+            program_docs.append(program_data)
+        return await upsert_many_unordered(self.program_collection, program_docs, keys)
 
-                PROGRESS_TRACKER[task_id]["processed"] = i + 1
-                PROGRESS_TRACKER[task_id]["progress"] = int(
-                    ((i + 1) / total_rows) * 100)
+    async def process_program_csv(self, file_path: str, task_id: str):
+        await run_import(file_path, task_id, Program, self.bulk_add_programs, ImportJobMgr(self.db),
+                         load_validator=self._import_validator)
 
-            if errors:
-                error_path = file_path.replace(".csv", "_errors.csv")
-                pd.DataFrame(errors).to_csv(error_path, index=False)
-                PROGRESS_TRACKER[task_id]["error_file"] = error_path
-                PROGRESS_TRACKER[task_id]["failed"] = len(errors)
+    async def validate_program_csv(self, file_path: str) -> dict:
+        """Dry run of process_program_csv."""
+        return await dry_run_import(file_path, Program, accept_all, load_validator=self._import_validator)
 
-            PROGRESS_TRACKER[task_id]["status"] = "completed"
-            app_logger.info(PROGRESS_TRACKER[task_id])
+    async def _import_validator(self) -> FrameValidator:
+        return self.IMPORT_VALIDATOR
 
-        except Exception as e:
-            PROGRESS_TRACKER[task_id]["status"] = f"failed: {str(e)}"
-    
     async def get_programs_by_status(self, program_status: Literal["Active", "Inactive", "Deleted"]):
         try:
             programs = await self.program_collection.find({"status": program_status}).to_list(length=None)
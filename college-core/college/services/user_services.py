@@ -1,11 +1,22 @@
+import asyncio
 from datetime import datetime, timedelta
+from typing import Optional
 from bson import ObjectId
 from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from college.core.config import config
+from college.db.bulk import upsert_many_inserted, upsert_many_unordered
 from college.db.database import DatabaseConnection
+from college.db.mutations import VERSION_FIELD, build_update, update_and_fetch
+from college.db.transactions import RejectedRows, run_in_transaction
 from college.models.auth import UserLogin
+from college.models.pagination import PageParams
 from college.models.user import User, UserUpdate
 from college.services.auth_services import create_access_token
+from college.services.import_services import duplicate_checker
+from college.utils.concurrency import gather_all
+from college.utils.pagination import find_page, paginate
 from college.utils.utilities import UtilMgr
 from college.core.logging_config import app_logger
 
@@ -22,42 +33,175 @@ class UserMgr:
             self._util_mgr = UtilMgr()
         return self._util_mgr
     
-    async def check_email_exists(self, email: str):
+    async def add_user_to_db(self, user: User, session=None):
         try:
-            existingData = await self.user_collection.find_one({'email': email})
-            return existingData
-        except Exception as e:
-            app_logger.error(str(e))
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail=f"An error occurred while checking email {str(e)}")
-    
-    async def add_user_to_db(self, user: User):
-        try:
-            existing_user = await self.check_email_exists(user.email)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
-            user_data = user.model_dump(exclude_none=True)
-            password = self.util_mgr.generate_random_string(10)
-            user_data["password"] = password
-            user_data["created_at"] = datetime.now()
-            user_data["updated_at"] = datetime.now()
-            result = await self.user_collection.insert_one(user_data)
+            # The unique email index rejects duplicates, concurrent ones included
+            user_data = self.build_user_doc(user)
+            result = await self.user_collection.insert_one(user_data, session=session)
             return result.inserted_id
+        except DuplicateKeyError:
+            app_logger.error(f'Email already registered {user.email}')
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
         except Exception as e:
             app_logger.error(str(e))
             raise e
-    
-    async def get_all_users(self):
+
+    def build_user_doc(self, user: User) -> dict:
+        user_data = user.model_dump(exclude_none=True)
+        password = self.util_mgr.generate_random_string(10)
+        user_data["password"] = password
+        user_data["created_at"] = datetime.now()
+        user_data["updated_at"] = datetime.now()
+        return user_data
+
+    async def find_existing_emails(self, emails: list, *collections, exclude_keys: Optional[list] = None) -> set:
+        """Emails already present in users or any of the given collections, one $in query each.
+
+        Documents written under one of ``exclude_keys`` (import keys) are ignored.
+        """
+        query = {"email": {"$in": list(set(emails))}}
+        if exclude_keys:
+            query["import_key"] = {"$nin": exclude_keys}
+        results = await gather_all(*(
+            collection.find(query, {"email": 1, "_id": 0}).to_list(length=None)
+            for collection in (self.user_collection, *collections)))
+        return {doc["email"] for docs in results for doc in docs}
+
+    async def add_user_with_profile(self, profile_collection, profile, role: str):
+        """Create an Inactive user and its profile document in one transaction."""
+        profile_data = profile.model_dump(exclude_none=True)
+        user = User(
+            first_name=profile.first_name,
+            middle_name=profile.middle_name if profile.middle_name else None,
+            last_name=profile.last_name if profile.last_name else None,
+            email=profile.email,
+            role=role,
+            status="Inactive")
+
+        async def write_profile(session):
+            user_id = await self.add_user_to_db(user, session=session)
+            if not user_id:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to insert user into the database")
+            profile_data["user_id"] = str(user_id)
+            profile_data["created_at"] = datetime.now()
+            profile_data["updated_at"] = datetime.now()
+            try:
+                return await profile_collection.insert_one(profile_data, session=session)
+            except DuplicateKeyError:
+                if session is None:
+                    # Without a transaction the user has to be removed by hand
+                    await self.user_collection.delete_one({"_id": user_id})
+                app_logger.error(f'Email already registered {profile.email}')
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
+
+        return await run_in_transaction(self.db, write_profile)
+
+    def email_checker(self, profile_collection):
+        """Dry-run writer rejecting profiles whose email is taken in users or ``profile_collection``."""
+        return duplicate_checker(
+            "email", lambda emails: self.find_existing_emails(emails, profile_collection),
+            "Email already registered")
+
+    async def add_users_with_profiles(self, profile_collection, profiles: list, role: str, keys: list) -> dict:
+        """Bulk-create users with their profiles; return {position: error} for rejected ones."""
+        failures = {}
+        existing = await self.find_existing_emails(
+            [profile.email for profile in profiles], profile_collection, exclude_keys=keys)
+        seen = set()
+        for position, profile in enumerate(profiles):
+            if profile.email in existing or profile.email in seen:
+                failures[position] = "Email already registered"
+            seen.add(profile.email)
+
+        pending = [position for position in range(len(profiles)) if position not in failures]
+        while pending:
+            try:
+                failures.update(await run_in_transaction(
+                    self.db, lambda session: self._write_users_with_profiles(
+                        profile_collection, profiles, role, keys, pending, session)))
+                break
+            except RejectedRows as rejected:
+                failures.update(rejected.failures)
+                pending = [position for position in pending if position not in rejected.failures]
+        return failures
+
+    async def _write_users_with_profiles(self, profile_collection, profiles: list, role: str, keys: list,
+                                         pending: list, session=None) -> dict:
+        failures = {}
+        user_ids, user_docs = [], []
+        for position in pending:
+            profile = profiles[position]
+            user_doc = self.build_user_doc(User(
+                first_name=profile.first_name,
+                middle_name=profile.middle_name if profile.middle_name else None,
+                last_name=profile.last_name if profile.last_name else None,
+                email=profile.email,
+                role=role,
+                status="Inactive"))
+            user_doc["_id"] = ObjectId()
+            user_ids.append(user_doc["_id"])
+            user_docs.append(user_doc)
+        user_failures, inserted = await upsert_many_inserted(
+            self.user_collection, user_docs, [keys[position] for position in pending],
+            "Email already registered", session=session)
+        if user_failures and session is not None:
+            raise RejectedRows({pending[index]: error for index, error in user_failures.items()})
+
+        # Users left over by an earlier attempt keep the id they were created with
+        replayed = [keys[position] for index, position in enumerate(pending)
+                    if index not in user_failures and index not in inserted]
+        if replayed:
+            users = await self.user_collection.find(
+                {"import_key": {"$in": replayed}}, {"import_key": 1}, session=session).to_list(length=None)
+            replayed_ids = {user["import_key"]: user["_id"] for user in users}
+            user_ids = [replayed_ids.get(keys[position], user_id) for position, user_id in zip(pending, user_ids)]
+
+        created, profile_docs = [], []
+        for index, position in enumerate(pending):
+            if index in user_failures:
+                failures[position] = user_failures[index]
+                continue
+            profile_doc = profiles[position].model_dump(exclude_none=True)
+            profile_doc["user_id"] = str(user_ids[index])
+            profile_doc["created_at"] = datetime.now()
+            profile_doc["updated_at"] = datetime.now()
+            created.append(position)
+            profile_docs.append(profile_doc)
+        profile_failures = await upsert_many_unordered(
+            profile_collection, profile_docs, [keys[position] for position in created],
+            "Email already registered", session=session)
+        if profile_failures and session is not None:
+            raise RejectedRows({created[index]: error for index, error in profile_failures.items()})
+        # Without a transaction, remove the users this call created for profiles that failed
+        user_index = {position: index for index, position in enumerate(pending)}
+        orphans = [user_ids[user_index[created[index]]] for index in profile_failures
+                   if user_index[created[index]] in inserted]
+        if orphans:
+            await self.user_collection.delete_many({"_id": {"$in": orphans}})
+        for index, error in profile_failures.items():
+            failures[created[index]] = error
+        return failures
+
+    async def get_all_users(self, filters: Optional[dict] = None, page: Optional[PageParams] = None):
         try:
-            users = await self.user_collection.find().to_list(length=None)
+            users = await find_page(self.user_collection, filters, page).to_list(length=None)
             for user in users:
                 user["_id"] = str(user["_id"])
-            return users
+            return paginate(users, page)
         except Exception as e:
             app_logger.error(str(e))
             raise e
     
+    async def iter_users(self, filters: Optional[dict] = None):
+        cursor = self.user_collection.find(filters or {}, batch_size=config.STREAM_BATCH_SIZE)
+        async for user in cursor:
+            user["_id"] = str(user["_id"])
+            yield user
+
     async def verify_user_login(self, form_data: UserLogin):
         try:
             user = await self.user_collection.find_one({"email": form_data.email})
@@ -112,34 +256,64 @@ class UserMgr:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="An error occurred while changing password")
     
-    async def update_user_in_db(self, user_id: str, user_data: UserUpdate):
+    async def update_user_in_db(self, user_id: str, user_data: UserUpdate,
+                                return_document: bool = ReturnDocument.AFTER):
         try:
             print(f"User data: {user_data}")
-            user_obj_id = ObjectId(user_id)
-            raw_data = user_data.model_dump(exclude_none=True)
-
-            set_data = {}
-            unset_data = {}
-
-            for key, value in raw_data.items():
-                if value == "" or value is None:
-                    unset_data[key] = ""
-                else:
-                    set_data[key] = value
-
-            set_data["updated_at"] = datetime.now()
-            update_query = {}
-            if set_data:
-                update_query["$set"] = set_data
-            if unset_data:
-                update_query["$unset"] = unset_data
-
-            updated_user = await self.user_collection.update_one(
-                {"_id": user_obj_id},
-                update_query
-            )
-            return updated_user.modified_count
+            return await update_and_fetch(
+                self.user_collection, user_id, build_update(user_data.model_dump(exclude_none=True)),
+                return_document=return_document, projection={"password": 0})
+        except DuplicateKeyError:
+            app_logger.error(f'Email already registered {user_data.email}')
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
         except Exception as e:
             app_logger.error(str(e))
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail=f"Error updating user: {str(e)}")
\ No newline at end of file
+                                detail=f"Error updating user: {str(e)}")
+
+    async def update_user_with_profile(self, profile_collection, profile_id: str, profile_data,
+                                       expected_version: Optional[int] = None) -> Optional[dict]:
+        """Update a profile and the name and email of its user; return the profile."""
+        if not ObjectId.is_valid(profile_data.user_id or ""):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user_id")
+        user_data = UserUpdate(
+            first_name=profile_data.first_name,
+            middle_name=profile_data.middle_name,
+            last_name=profile_data.last_name,
+            email=profile_data.email,
+        )
+        update_profile = update_and_fetch(
+            profile_collection, profile_id, build_update(profile_data.model_dump()), expected_version)
+        if expected_version is not None:
+            # The profile goes first so a stale version leaves the user untouched
+            profile = await update_profile
+            if profile is not None:
+                await self.update_user_in_db(profile_data.user_id, user_data)
+            return profile
+
+        # Both writes run to completion so a failed profile can still undo the user
+        profile, previous = await asyncio.gather(
+            update_profile, self.update_user_in_db(profile_data.user_id, user_data, ReturnDocument.BEFORE),
+            return_exceptions=True)
+        if (profile is None or isinstance(profile, BaseException)) and isinstance(previous, dict):
+            await self._restore_user(previous, user_data.model_dump(exclude_none=True))
+        for result in (profile, previous):
+            if isinstance(result, DuplicateKeyError):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
+            if isinstance(result, BaseException):
+                raise result
+        return profile
+
+    async def _restore_user(self, previous: dict, changed: dict):
+        fields = [*changed, "updated_at", VERSION_FIELD]
+        update = {}
+        set_data = {field: previous[field] for field in fields if previous.get(field) is not None}
+        unset_data = {field: "" for field in fields if previous.get(field) is None}
+        if set_data:
+            update["$set"] = set_data
+        if unset_data:
+            update["$unset"] = unset_data
+        # Skipped if anyone else has written the user since our update
+        await self.user_collection.update_one(
+            {"_id": ObjectId(previous["_id"]), VERSION_FIELD: (previous.get(VERSION_FIELD) or 0) + 1}, update)
@@ -0,0 +1,28 @@
+import asyncio
+from typing import Awaitable
+from fastapi import HTTPException
+from college.core.logging_config import app_logger
+
+
+async def gather_all(*aws: Awaitable) -> list:
+    """Await independent calls concurrently and return their results in order.
+
+    Runs them in an asyncio.TaskGroup: the first failure cancels the others
+    and nothing is left running once this returns or raises, including when
+    the caller itself is cancelled. Every failure is logged. One error is
+    re-raised as is; when several fail together the first HTTPException (or
+    else the first error) is raised with the whole group as its cause, so
+    routes still answer with the right status.
+    """
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(aw) for aw in aws]
+    except BaseExceptionGroup as eg:
+        errors = eg.exceptions
+        for error in errors:
+            app_logger.error(f'Concurrent call failed: {error!r}')
+        if len(errors) == 1:
+            raise errors[0]
+        first = next((error for error in errors if isinstance(error, HTTPException)), errors[0])
+        raise first from eg
+    return [task.result() for task in tasks]
@@ -0,0 +1,98 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional
+
+BatchFn = Callable[[list], Awaitable[dict]]
+
+_request_loaders: ContextVar[Optional[dict]] = ContextVar("request_loaders", default=None)
+
+
+class DataLoader:
+    """Coalesces load() calls issued in the same event-loop tick into one batch fetch.
+
+    ``batch_fn`` receives the distinct pending keys and returns a dict of the
+    values it found; missing keys resolve to None. Every key is fetched at
+    most once for the lifetime of the loader, which acts as an identity map.
+    """
+
+    def __init__(self, batch_fn: BatchFn):
+        self._batch_fn = batch_fn
+        self._futures: dict = {}
+        self._pending: list = []
+        # The loop only keeps weak references to tasks; in-flight batches live here
+        self._tasks: set = set()
+
+    async def load(self, key: Hashable) -> Any:
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            self._pending.append(key)
+            if len(self._pending) == 1:
+                loop.call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Hashable]) -> dict:
+        keys = list(dict.fromkeys(key for key in keys if key))
+        values = await asyncio.gather(*(self.load(key) for key in keys))
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def prime(self, key: Hashable, value: Any):
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def clear(self, key: Hashable):
+        self._futures.pop(key, None)
+
+    def _dispatch(self):
+        keys, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, keys: list):
+        try:
+            results = await self._batch_fn(keys)
+        except BaseException as e:
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        for key in keys:
+            future = self._futures.get(key)
+            if future is not None and not future.done():
+                future.set_result(results.get(key))
+
+
+def start_request_scope():
+    return _request_loaders.set({})
+
+
+def end_request_scope(token):
+    _request_loaders.reset(token)
+
+
+def detach_request_scope():
+    """Stop sharing loaders with the request, e.g. in work that outlives it."""
+    _request_loaders.set(None)
+
+
+def get_request_loader(name: str, batch_fn: BatchFn) -> Optional[DataLoader]:
+    """The current request's loader for ``name``, or None outside a request."""
+    loaders = _request_loaders.get()
+    if loaders is None:
+        return None
+    loader = loaders.get(name)
+    if loader is None:
+        loader = loaders[name] = DataLoader(batch_fn)
+    return loader
+
+
+def clear_request_key(name: str, key: Hashable):
+    loaders = _request_loaders.get()
+    if loaders and name in loaders:
+        loaders[name].clear(key)
@@ -0,0 +1,107 @@
+import re
+from typing import Optional
+import pandas as pd
+
+EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+PHONE_PATTERN = re.compile(r"^\d{10}$")
+DATE_FORMAT = "%Y-%m-%d"
+GENDERS = ("Male", "Female", "Others")
+
+
+def _as_text(series: pd.Series) -> pd.Series:
+    return series.astype("string").str.strip()
+
+
+def _present(series: pd.Series) -> pd.Series:
+    return series.notna() & _as_text(series).ne("").fillna(False)
+
+
+class FrameValidator:
+    """Column-wise validation of an upload chunk before any model is built.
+
+    Every check runs as a vectorized pandas operation over the whole chunk.
+    ``validate`` returns a frame with one column per checked field holding
+    the error message for that cell (None when valid), which can be joined
+    into the error file's ``error`` column.
+
+    ``references`` maps a name column to ``(id_column, {name: id}, message)``;
+    ``resolve`` replaces the names with ids for rows that passed.
+    """
+
+    def __init__(self, required=(), emails=(), phones=(), dates=(), integers=(),
+                 choices: Optional[dict] = None, references: Optional[dict] = None,
+                 required_references=()):
+        self.required = tuple(required)
+        self.emails = tuple(emails)
+        self.phones = tuple(phones)
+        self.dates = tuple(dates)
+        self.integers = tuple(integers)
+        self.choices = choices or {}
+        self.references = references or {}
+        self.required_references = tuple(required_references)
+
+    def validate(self, df: pd.DataFrame) -> pd.DataFrame:
+        messages = pd.DataFrame(index=df.index)
+
+        def flag(column: str, mask: pd.Series, message: str):
+            mask = mask.fillna(False).astype(bool)
+            if not mask.any():
+                return
+            current = messages[column] if column in messages else pd.Series(None, index=df.index, dtype=object)
+            messages[column] = current.where(~mask | current.notna(), message)
+
+        def column(name: str) -> pd.Series:
+            return df[name] if name in df else pd.Series(None, index=df.index, dtype=object)
+
+        for name in self.required:
+            flag(name, ~_present(column(name)), f"{name}: Field required")
+        for name in self.emails:
+            values = column(name)
+            flag(name, _present(values) & ~_as_text(values).str.fullmatch(EMAIL_PATTERN.pattern),
+                 f"{name}: value is not a valid email address")
+        for name in self.phones:
+            values = column(name)
+            flag(name, _present(values) & ~_as_text(values).str.fullmatch(PHONE_PATTERN.pattern),
+                 f"{name}: must be a 10 digit number")
+        for name in self.dates:
+            values = column(name)
+            parsed = pd.to_datetime(values, format=DATE_FORMAT, errors="coerce")
+            flag(name, _present(values) & parsed.isna(),
+                 f"{name}: Input should be a valid date in YYYY-MM-DD format")
+        for name in self.integers:
+            values = column(name)
+            parsed = pd.to_numeric(values, errors="coerce")
+            flag(name, _present(values) & (parsed.isna() | (parsed % 1 != 0)),
+                 f"{name}: Input should be a valid integer")
+        for name, allowed in self.choices.items():
+            values = column(name)
+            flag(name, _present(values) & ~_as_text(values).isin(allowed),
+                 f"{name}: Input should be {', '.join(repr(a) for a in allowed)}")
+        for name, (_, mapping, message) in self.references.items():
+            values = column(name)
+            present = _present(values)
+            missing = ~present if name in self.required_references else pd.Series(False, index=df.index)
+            flag(name, missing | (present & ~_as_text(values).isin(list(mapping))), message)
+        return messages
+
+    def resolve(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        for name, (id_column, mapping, _) in self.references.items():
+            if name in df:
+                df[id_column] = _as_text(df[name]).map(mapping)
+                df = df.drop(columns=[name])
+        return df
+
+
+def row_errors(messages: pd.DataFrame) -> pd.Series:
+    """Join the per-column messages of each row; None for rows without errors."""
+    joined = pd.Series(pd.NA, index=messages.index, dtype="string")
+    for name in messages.columns:
+        message = messages[name].astype("string")
+        joined = (joined + "; " + message).fillna(joined).fillna(message)
+    return joined.astype(object).where(joined.notna(), None)
+
+
+def to_records(df: pd.DataFrame) -> list:
+    """Row dicts with empty cells as None rather than NaN."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
@@ -0,0 +1,108 @@
+import base64
+import binascii
+from typing import Literal, Optional
+from bson import ObjectId, json_util
+from fastapi import HTTPException, Query, status
+from pymongo import ASCENDING, DESCENDING
+from college.models.pagination import PageParams
+
+
+def get_page_params(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    sort: Literal["_id", "updated_at"] = Query("_id"),
+    order: Literal["asc", "desc"] = Query("asc"),
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor, sort=sort, order=order)
+
+
+def build_filters(**filters) -> dict:
+    """Drop filters that were not supplied in the request."""
+    return {field: value for field, value in filters.items() if value is not None}
+
+
+def is_paged(page: Optional[PageParams]) -> bool:
+    return page is not None and page.limit is not None
+
+
+def encode_cursor(doc: dict, page: PageParams) -> str:
+    payload = {"s": page.sort, "o": page.order, "id": ObjectId(doc["_id"])}
+    if page.sort != "_id":
+        payload["v"] = doc.get(page.sort)
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode()
+
+
+def decode_cursor(page: PageParams) -> dict:
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(page.cursor.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if not isinstance(payload, dict) or not isinstance(payload.get("id"), ObjectId):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if payload.get("s") != page.sort or payload.get("o") != page.order:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Cursor does not match the requested sort order")
+    return payload
+
+
+def page_query(filters: Optional[dict], page: Optional[PageParams]) -> dict:
+    """Filters plus the keyset condition that starts after the page cursor."""
+    query = dict(filters or {})
+    if not is_paged(page) or not page.cursor:
+        return query
+    payload = decode_cursor(page)
+    op = "$gt" if page.order == "asc" else "$lt"
+    if page.sort == "_id":
+        query["_id"] = {op: payload["id"]}
+        return query
+    value = payload.get("v")
+    tie_break = {page.sort: value, "_id": {op: payload["id"]}}
+    if value is None:
+        # Missing sort values order before every other value
+        after = [{page.sort: {"$ne": None}}] if page.order == "asc" else []
+    elif page.order == "asc":
+        after = [{page.sort: {op: value}}]
+    else:
+        # Missing values sort last when descending, so they are all still ahead
+        after = [{page.sort: {op: value}}, {page.sort: None}]
+    query["$or"] = after + [tie_break]
+    return query
+
+
+def page_sort(page: Optional[PageParams]) -> list:
+    if page is None:
+        return [("_id", ASCENDING)]
+    direction = ASCENDING if page.order == "asc" else DESCENDING
+    if page.sort == "_id":
+        return [("_id", direction)]
+    return [(page.sort, direction), ("_id", direction)]
+
+
+def page_stages(filters: Optional[dict], page: Optional[PageParams]) -> list:
+    """Leading $match/$sort/$limit stages for paginated aggregations."""
+    stages = [{"$match": page_query(filters, page)}]
+    if is_paged(page):
+        stages.append({"$sort": dict(page_sort(page))})
+        stages.append({"$limit": page.limit + 1})
+    return stages
+
+
+def find_page(collection, filters: Optional[dict], page: Optional[PageParams]):
+    """Find cursor over one page (plus a look-ahead row) or the whole filtered set."""
+    cursor = collection.find(page_query(filters, page))
+    if is_paged(page):
+        cursor = cursor.sort(page_sort(page)).limit(page.limit + 1)
+    return cursor
+
+
+def paginate(items: list, page: Optional[PageParams]):
+    """Trim the look-ahead row and wrap paged results with the next cursor.
+
+    Unpaged requests get the plain list, as list endpoints always returned.
+    """
+    if not is_paged(page):
+        return items
+    has_more = len(items) > page.limit
+    items = items[:page.limit]
+    next_cursor = encode_cursor(items[-1], page) if has_more and items else None
+    return {"items": items, "next": next_cursor}
@@ -0,0 +1,210 @@
+import csv
+import hashlib
+from datetime import date, datetime, time
+from typing import Iterator, Optional
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from openpyxl import load_workbook
+from college.core.config import config
+
+_COUNT_BLOCK_SIZE = 1 << 20
+ARROW_WINDOW_BYTES = 8 << 20
+EXCEL_EXTENSIONS = (".xlsx",)
+
+
+def count_data_rows(file_path: str) -> int:
+    """Count data rows (lines after the header) without loading the file.
+
+    Quoted fields spanning several lines are counted once per line, so this
+    is an upper bound used for progress reporting only.
+    """
+    lines = 0
+    last_byte = b"\n"
+    with open(file_path, "rb") as f:
+        while block := f.read(_COUNT_BLOCK_SIZE):
+            lines += block.count(b"\n")
+            last_byte = block[-1:]
+    if last_byte != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def file_digest(file_path: str) -> str:
+    """SHA-256 of the file contents, read block by block."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(_COUNT_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_csv_chunks(file_path: str, chunk_size: int, dtype: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+    """Yield the CSV as DataFrames of at most ``chunk_size`` rows."""
+    with pd.read_csv(file_path, dtype=dtype, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def _arrow_windows(f) -> Iterator[pa.Buffer]:
+    """Split the rest of ``f`` into blocks of about ARROW_WINDOW_BYTES ending at a newline."""
+    carry = b""
+    while block := f.read(ARROW_WINDOW_BYTES):
+        block = carry + block if carry else block
+        cut = block.rfind(b"\n") + 1
+        if not cut:
+            carry = block
+            continue
+        # Zero-copy view of the complete lines; only the partial last line is carried over
+        yield pa.py_buffer(block)[:cut]
+        carry = block[cut:]
+    if carry.strip():
+        yield pa.py_buffer(carry)
+
+
+def read_csv_chunks_arrow(file_path: str, chunk_size: int, dtype: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+    """Yield the CSV as DataFrames with pyarrow-backed columns.
+
+    The file is parsed one window of ARROW_WINDOW_BYTES at a time with
+    Arrow's multithreaded reader, so peak memory grows with the window
+    (roughly ten times its size while parsing) rather than the file. Every
+    column is read as text, matching what the pandas backend hands the
+    validator. Windows are cut at newlines, which assumes no
+    quoted value spans several lines. Chunks hold at most ``chunk_size``
+    rows; the last chunk of each window may be shorter.
+    """
+    with open(file_path, "rb") as f:
+        header = f.readline().decode("utf-8-sig")
+        column_names = next(csv.reader([header]), [])
+        # Arrow's type inference would turn dates into date32 and skip the format checks
+        column_types = {name: pa.string() for name in column_names}
+        read_options = pacsv.ReadOptions(column_names=column_names, use_threads=True)
+        convert_options = pacsv.ConvertOptions(
+            column_types=column_types, strings_can_be_null=True, quoted_strings_can_be_null=True)
+        pool = pa.default_memory_pool()
+        for window in _arrow_windows(f):
+            # Hand the previous window's parse buffers back before the next one
+            pool.release_unused()
+            table = pacsv.read_csv(pa.BufferReader(window), read_options=read_options,
+                                   convert_options=convert_options)
+            for offset in range(0, table.num_rows, chunk_size):
+                yield table.slice(offset, chunk_size).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+CSV_READERS = {
+    "pandas": read_csv_chunks,
+    "arrow": read_csv_chunks_arrow,
+}
+
+
+def is_excel(file_path: str) -> bool:
+    return file_path.lower().endswith(EXCEL_EXTENSIONS)
+
+
+def _excel_rows(file_path: str) -> Iterator[tuple]:
+    # read_only streams the sheet XML instead of building the whole workbook
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _excel_cell(value):
+    """Render a cell the way the same value would read from a CSV export."""
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == time() else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+
+def _excel_columns(header: tuple) -> list:
+    return [str(name).strip() if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+
+
+def _excel_frame(records: list, columns: list, dtype: Optional[dict]) -> pd.DataFrame:
+    df = pd.DataFrame(records, columns=columns)
+    for column, kind in (dtype or {}).items():
+        if column in df and kind is str:
+            values = df[column].astype("string")
+            df[column] = values.astype(object).where(values.notna(), None)
+    return df
+
+
+def read_excel_header(file_path: str) -> list:
+    rows = _excel_rows(file_path)
+    try:
+        header = next(rows, None)
+    finally:
+        rows.close()
+    return _excel_columns(header) if header else []
+
+
+def count_excel_rows(file_path: str) -> int:
+    """Data rows according to the sheet's recorded dimensions; progress only."""
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        return max((workbook.active.max_row or 1) - 1, 0)
+    finally:
+        workbook.close()
+
+
+def read_excel_chunks(file_path: str, chunk_size: int, dtype: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+    """Yield the first sheet as DataFrames of at most ``chunk_size`` rows.
+
+    Rows are streamed from the workbook, so memory is bounded by the chunk
+    size rather than the sheet size. Blank rows are skipped as read_csv does.
+    """
+    rows = _excel_rows(file_path)
+    try:
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _excel_columns(header)
+        width = len(columns)
+        records = []
+        for row in rows:
+            values = [_excel_cell(value) for value in row[:width]]
+            if all(value is None for value in values):
+                continue
+            records.append(values + [None] * (width - len(values)))
+            if len(records) >= chunk_size:
+                yield _excel_frame(records, columns, dtype)
+                records = []
+        if records:
+            yield _excel_frame(records, columns, dtype)
+    finally:
+        rows.close()
+
+
+def count_rows(file_path: str) -> int:
+    return count_excel_rows(file_path) if is_excel(file_path) else count_data_rows(file_path)
+
+
+def read_chunks(file_path: str, chunk_size: int, dtype: Optional[dict] = None,
+                skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """Yield a CSV or Excel upload as DataFrames of at most ``chunk_size`` rows.
+
+    Chunks are indexed by each row's position among the data rows of the
+    file, and the first ``skip_rows`` of them are dropped. Skipping counts
+    parsed rows rather than lines, so positions stay stable across blank
+    lines and multi-line fields.
+    """
+    reader = read_excel_chunks if is_excel(file_path) else CSV_READERS[config.IMPORT_READER_BACKEND]
+    chunks = reader(file_path, chunk_size, dtype)
+    start = 0
+    try:
+        for chunk in chunks:
+            end = start + len(chunk)
+            if end > skip_rows:
+                chunk = chunk.iloc[max(skip_rows - start, 0):]
+                chunk.index = pd.RangeIndex(end - len(chunk), end)
+                yield chunk
+            start = end
+    finally:
+        chunks.close()
@@ -0,0 +1,19 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from college.utils.dataloader import end_request_scope, start_request_scope
+
+
+class RequestScopeMiddleware:
+    """Gives every HTTP request its own set of DataLoaders."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = start_request_scope()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end_request_scope(token)
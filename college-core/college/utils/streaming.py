@@ -0,0 +1,79 @@
+import json
+from datetime import date, datetime
+from typing import AsyncIterator, Literal, Optional
+from bson import ObjectId
+from fastapi.responses import StreamingResponse
+from college.core.logging_config import app_logger
+
+StreamFormat = Literal["ndjson", "json"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def _json_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_document(doc: dict) -> bytes:
+    return json.dumps(doc, default=_json_default, separators=(",", ":")).encode()
+
+
+async def iter_chunks(cursor, size: int) -> AsyncIterator[list]:
+    """Group documents from an async cursor into lists of at most ``size``."""
+    chunk = []
+    async for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def stream_documents(documents: AsyncIterator[dict], fmt: StreamFormat) -> AsyncIterator[bytes]:
+    """Serialize documents one at a time as NDJSON lines or a JSON array."""
+    first = True
+    if fmt == "json":
+        yield b"["
+    try:
+        async for doc in documents:
+            if fmt == "ndjson":
+                yield encode_document(doc) + b"\n"
+            else:
+                yield (b"" if first else b",") + encode_document(doc)
+            first = False
+    except Exception as e:
+        # Headers are already sent, so the truncated body is the only signal
+        app_logger.error(f'Streaming response aborted: {str(e)}')
+        return
+    if fmt == "json":
+        yield b"]"
+
+
+def streaming_response(documents: AsyncIterator[dict], fmt: StreamFormat) -> StreamingResponse:
+    return StreamingResponse(stream_documents(documents, fmt), media_type=MEDIA_TYPES[fmt])
+
+
+def encode_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: ".encode() + encode_document(data) + b"\n\n"
+
+
+async def stream_events(events: AsyncIterator[Optional[tuple]]) -> AsyncIterator[bytes]:
+    """Serialize ``(event, data)`` pairs as Server-Sent Events; None sends a keep-alive."""
+    try:
+        async for item in events:
+            yield b": keep-alive\n\n" if item is None else encode_event(*item)
+    except Exception as e:
+        app_logger.error(f'Event stream aborted: {str(e)}')
+
+
+def event_stream_response(events: AsyncIterator[Optional[tuple]]) -> StreamingResponse:
+    return StreamingResponse(stream_events(events), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,234 @@
+import asyncio
+import codecs
+import csv
+import hashlib
+import os
+import uuid
+from fastapi import HTTPException, Request, status
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from college.core.config import config
+from college.core.logging_config import app_logger
+from college.utils.readers import count_excel_rows, read_excel_header
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+MAX_HEADER_BYTES = 64 * 1024
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+# Boundaries and part headers around the file; a larger body cannot fit the limit
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+# Upload routes read the body themselves, so the form is described for the docs here
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["file"],
+            "properties": {"file": {"type": "string", "format": "binary"}},
+        }}},
+    }
+}
+
+
+def _check_columns(columns: list, required_columns: tuple):
+    present = {column.strip() for column in columns}
+    missing = [column for column in required_columns if column not in present]
+    if missing:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Missing columns: {', '.join(missing)}")
+
+
+def _check_header(header: bytes, required_columns: tuple):
+    try:
+        line = header.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="File must be UTF-8 encoded")
+    _check_columns(next(csv.reader([line]), []), required_columns)
+
+
+def _inspect_excel(file_path: str, required_columns: tuple) -> int:
+    """Check the workbook's header row and return its data row count."""
+    try:
+        columns = read_excel_header(file_path)
+        rows = count_excel_rows(file_path)
+    except Exception as e:
+        app_logger.error(f'Unreadable Excel upload {file_path}: {str(e)}')
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Excel file")
+    _check_columns(columns, required_columns)
+    return rows
+
+
+class _FilePart:
+    """Collects the ``file`` field of a multipart body as the parser reaches it.
+
+    Parser callbacks are synchronous, so they only record what they see;
+    save_upload() takes the data after each body chunk.
+    """
+
+    def __init__(self):
+        self.filename = None
+        self.done = False
+        self._in_file = False
+        self._headers = {}
+        self._field = self._value = b""
+        self._data = []
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": self._header_field,
+            "on_header_value": self._header_value,
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        }
+
+    def take(self) -> list:
+        data, self._data = self._data, []
+        return data
+
+    def _part_begin(self):
+        self._headers = {}
+
+    def _header_field(self, data: bytes, start: int, end: int):
+        self._field += data[start:end]
+
+    def _header_value(self, data: bytes, start: int, end: int):
+        self._value += data[start:end]
+
+    def _header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+
+    def _headers_finished(self):
+        _, params = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if params.get(b"name") == b"file" and self.filename is None:
+            self._in_file = True
+            self.filename = params.get(b"filename", b"").decode("utf-8", "replace")
+
+    def _part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self._data.append(bytes(data[start:end]))
+
+    def _part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self.done = True
+
+
+def _multipart_boundary(request: Request) -> bytes:
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > config.MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds {config.MAX_UPLOAD_BYTES} bytes")
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Expected a multipart/form-data upload")
+    return params[b"boundary"]
+
+
+async def save_upload(request: Request, required_columns: tuple = ()) -> dict:
+    """Stream the ``file`` field of a multipart request body to UPLOADS_DIR.
+
+    The body is parsed as it arrives rather than after Starlette has spooled
+    the whole form, so the content hash and an upper bound of the data row
+    count are computed on the way. A request whose Content-Length already
+    exceeds MAX_UPLOAD_BYTES is refused before its body is read. A CSV
+    upload is rejected as soon as the header lacks one of
+    ``required_columns`` or the bytes stop being valid UTF-8, and any upload
+    is rejected once it exceeds MAX_UPLOAD_BYTES; the partial file is
+    removed in every case. Writes happen off the event loop in blocks of
+    UPLOAD_CHUNK_SIZE. Excel workbooks can only be inspected once complete,
+    so their header is checked right after the upload is saved.
+    """
+    part = _FilePart()
+    parser = MultipartParser(_multipart_boundary(request), part.callbacks())
+
+    uploads_dir = os.path.abspath(config.UPLOADS_DIR)
+    file_path = partial_path = f = None
+    is_csv = False
+
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    size = lines = 0
+    header = b""
+    header_checked = True
+    last_byte = b"\n"
+    pending, pending_size = [], 0
+    try:
+        async for body in request.stream():
+            try:
+                parser.write(body)
+            except MultipartParseError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed multipart body")
+            if part.filename is not None and f is None:
+                if not part.filename.endswith(SUPPORTED_EXTENSIONS):
+                    raise HTTPException(
+                        status_code=400, detail="Only CSV or Excel files are supported"
+                    )
+                is_csv = part.filename.endswith(".csv")
+                header_checked = not is_csv
+                os.makedirs(uploads_dir, exist_ok=True)
+                file_path = os.path.join(uploads_dir, f"{uuid.uuid4().hex}_{os.path.basename(part.filename)}")
+                partial_path = f"{file_path}.part"
+                f = await asyncio.to_thread(open, partial_path, "wb")
+            for chunk in part.take():
+                size += len(chunk)
+                if size > config.MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413,
+                                        detail=f"File exceeds {config.MAX_UPLOAD_BYTES} bytes")
+                if is_csv:
+                    try:
+                        decoder.decode(chunk)
+                    except UnicodeDecodeError:
+                        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                            detail="File must be UTF-8 encoded")
+                if not header_checked:
+                    header += chunk
+                    if b"\n" in header or len(header) > MAX_HEADER_BYTES:
+                        _check_header(header.split(b"\n", 1)[0].rstrip(b"\r"), required_columns)
+                        header_checked = True
+                digest.update(chunk)
+                lines += chunk.count(b"\n")
+                last_byte = chunk[-1:] or last_byte
+                pending.append(chunk)
+                pending_size += len(chunk)
+            if pending_size >= UPLOAD_CHUNK_SIZE:
+                await asyncio.to_thread(f.write, b"".join(pending))
+                pending, pending_size = [], 0
+        if not part.done:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No file uploaded")
+        if pending:
+            await asyncio.to_thread(f.write, b"".join(pending))
+        await asyncio.to_thread(f.close)
+        if is_csv:
+            decoder.decode(b"", final=True)
+            if not header_checked:
+                _check_header(header.rstrip(b"\r"), required_columns)
+            if last_byte != b"\n":
+                lines += 1
+            rows = max(lines - 1, 0)
+        os.replace(partial_path, file_path)
+        if not is_csv:
+            rows = await asyncio.to_thread(_inspect_excel, file_path, required_columns)
+    except UnicodeDecodeError:
+        os.remove(partial_path)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="File must be UTF-8 encoded")
+    except Exception:
+        if f is not None:
+            f.close()
+        for path in (partial_path, file_path):
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+        raise
+
+    app_logger.info(f'Saved upload {part.filename} ({size} bytes) to {file_path}')
+    return {
+        "file_path": file_path,
+        "file_name": part.filename,
+        "file_hash": digest.hexdigest(),
+        "size": size,
+        "rows": rows,
+    }
@@ -2,13 +2,16 @@ import random
 import string
 from typing import Optional
 from passlib.context import CryptContext
-import csv
 import re
 import os
 from datetime import datetime
+import numpy as np
+import pandas as pd
 from college.core.config import config
+from college.utils.import_validation import EMAIL_PATTERN
 
 PROGRESS_TRACKER = {}
+SPECIAL_CHAR_PATTERN = re.compile(r'[!@#$%^&*(),.?":{}|<>]')
 
 
 class UtilMgr:
@@ -27,7 +30,7 @@ class UtilMgr:
             return False
         if not re.search(r'[0-9]', password):  # Digit
             return False
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):  # Special character
+        if not SPECIAL_CHAR_PATTERN.search(password):  # Special character
             return False
         # If all conditions are met, return True
         return True
@@ -36,45 +39,32 @@ class UtilMgr:
         return bool(name.strip())
 
     def is_valid_email(self, email: str) -> bool:
-        pattern = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
-        return re.match(pattern, email) is not None
+        return EMAIL_PATTERN.match(email) is not None
 
     def validate_csv(self, file_path: str, output_error_file: str) -> str:
-        invalid_data = []
-        # Open and read the CSV file
-        with open(file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            # Process each row of the CSV
-            for row in reader:
-                errors = []
-                # Validate Name
-                if not self.is_valid_name(row['name']):
-                    errors.append("Invalid name (name can't be empty)")
-                # Validate Email
-                if not self.is_valid_email(row['email']):
-                    errors.append("Invalid email format")
-                # Validate Password
-                if not self.is_valid_password(row['password']):
-                    errors.append(
-                        "Invalid password (must be > 10 chars, include 1 capital letter, 1 small letter, 1 number, 1 special character)")
-                # If there are any errors, save the row and the errors
-                if errors:
-                    invalid_data.append({
-                        'name': row['name'],
-                        'email': row['email'],
-                        'password': row['password'],
-                        # Join multiple errors in one string
-                        'errors': ', '.join(errors)
-                    })
+        df = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+        name = df["name"].str.strip()
+        email = df["email"]
+        password = df["password"]
+        # Validate every row at once; each mask marks the rows failing one rule
+        checks = [
+            (name.eq(""), "Invalid name (name can't be empty)"),
+            (~email.str.fullmatch(EMAIL_PATTERN.pattern), "Invalid email format"),
+            (password.str.len().lt(10)
+             | ~password.str.contains(r'[A-Z]')
+             | ~password.str.contains(r'[a-z]')
+             | ~password.str.contains(r'[0-9]')
+             | ~password.str.contains(SPECIAL_CHAR_PATTERN.pattern),
+             "Invalid password (must be > 10 chars, include 1 capital letter, 1 small letter, 1 number, 1 special character)"),
+        ]
+        errors = pd.Series("", index=df.index)
+        for mask, message in checks:
+            errors = errors.where(~mask, errors + np.where(errors.eq(""), "", ", ") + message)
+        invalid = errors.ne("")
         # Write the errors to an output CSV file
-        if invalid_data:
-            with open(output_error_file, mode='w', newline='', encoding='utf-8') as errorfile:
-                fieldnames = ['name', 'email', 'password', 'errors']
-                writer = csv.DictWriter(errorfile, fieldnames=fieldnames)
-
-                writer.writeheader()  # Write header
-                for data in invalid_data:
-                    writer.writerow(data)
+        if invalid.any():
+            invalid_data = df.loc[invalid, ["name", "email", "password"]].assign(errors=errors[invalid])
+            invalid_data.to_csv(output_error_file, index=False)
             print(f"Error file has been created: {output_error_file}")
             return output_error_file
         else:
@@ -0,0 +1,16 @@
+from typing import Optional
+from fastapi import Header, HTTPException, status
+
+
+def get_expected_version(if_match: Optional[str] = Header(None)) -> Optional[int]:
+    """The document version an update was based on, sent as ``If-Match: <version>``."""
+    if if_match is None:
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="If-Match must be a document version")
@@ -8,5 +8,7 @@ python-dotenv
 pydantic[email]
 apscheduler
 pandas
+openpyxl
+pyarrow
 python-multipart
 pymongo
\ No newline at end of file